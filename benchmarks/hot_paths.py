@@ -0,0 +1,283 @@
+"""
+Benchmarks of the hot paths of the flight model: loading of datasets, interpolation, angle of attack solving, mass
+distribution and the mass ratio sweep of not_centered_mass_analysis_V2.
+
+The benchmarks run on the bundled data_CFD / data_overall_drag files and on synthetic grids of angle of attack x
+velocity up-scaled to the given numbers of rows. For every benchmark the per-call latency (best of several rounds),
+the throughput (evaluated points per second) and the peak memory allocated by one call (tracemalloc) are recorded.
+
+The results can be saved as a baseline and later runs compared against it, a benchmark whose latency or peak memory
+grows more than the tolerance over the baseline is reported as a regression. Baselines are specific to the machine,
+so none is committed: save one on the machine before a change and compare with it after the change, e.g.
+
+    git stash && python -m benchmarks.hot_paths --save baseline.json && git stash pop
+    python -m benchmarks.hot_paths --compare baseline.json
+
+The data of a benchmark (the datasets, the synthetic grids) is prepared on its first call, which is the warm-up call
+of measure and isn't measured, so the benchmarks excluded by --filter don't prepare any data.
+
+Usage: python -m benchmarks.hot_paths [--sizes 10000 100000 1000000] [--filter TEXT] [--save FILE] [--compare FILE]
+    [--tolerance 0.25]
+"""
+import argparse
+import functools
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from src.boat_analysis.Boat import Boat
+from src.boat_analysis.OverallAnalysis import _calculate_aoa_based_on_area, _find_angle_of_attack, \
+    overall_front_drag_analysis
+from src.foils_data.FoilManager import foil_manager_procedure
+from src.foils_data.FoilRegistry import DEFAULT_CATALOG_PATH, FoilRegistry
+
+# Minimal time of one measurement round in s, enough calls are made to fill it
+ROUND_TIME = 0.2
+ROUNDS = 3
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+# Number of points of the batch benchmarks
+BATCH_SIZE = 100000
+
+# Growth of the peak memory smaller than this is noise (e.g. caches of pandas filled by the benchmarks run before), it
+# isn't reported as a regression
+MEMORY_NOISE_BYTES = 64 * 1024
+
+
+def measure(function, items=1):
+    """
+    Measure a benchmark.
+
+    Parameters:
+        function (callable): the benchmarked call, without arguments.
+        items (int): number of points evaluated by one call, for the throughput.
+
+    Returns:
+        dict: latency_s (best per-call time of the rounds), throughput (items per s), peak_memory_bytes
+    """
+    # Warm up, so the lazily built interpolators and caches aren't measured
+    function()
+
+    start = time.perf_counter()
+    function()
+    single = time.perf_counter() - start
+    calls = max(1, int(ROUND_TIME / max(single, 1e-9)))
+
+    # Calls slower than a round are measured only once
+    latency = single
+    for _ in range(ROUNDS if single < ROUND_TIME else 0):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        latency = min(latency, (time.perf_counter() - start) / calls)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'latency_s': latency, 'throughput': items / latency, 'peak_memory_bytes': peak}
+
+
+def write_synthetic_csv(path, rows):
+    """
+    Write a CFD results csv file with a smooth synthetic angle of attack x velocity grid of about rows points.
+    """
+    n = int(np.sqrt(rows))
+    aoa, vel = np.meshgrid(np.linspace(-5, 10, n), np.linspace(0.5, 12, n), indexing='ij')
+    lift_coefficient = 0.1 * (aoa + 3) * (1 - np.exp(-vel)) + 0.2
+    drag_coefficient = 0.01 + 0.0005 * aoa ** 2 + 0.002 / vel
+    dynamic_force = 0.5 * 998.2 * vel ** 2 * 0.03
+    frame = pd.DataFrame({
+        'angle_of_attack': aoa.ravel(),
+        'inlet_vel': vel.ravel(),
+        'moment': (0.01 * dynamic_force).ravel(),
+        'drag_force': (dynamic_force * drag_coefficient).ravel(),
+        'lift_force': (dynamic_force * lift_coefficient).ravel(),
+        'lift_coefficient': 0,
+        'drag_coefficient': 0,
+    })
+    with open(path, 'w') as file:
+        file.write(';;;;;;\n')
+        frame.to_csv(file, sep=';', index=False)
+
+
+def dataset_benchmarks(registry, cache_dir):
+    """
+    Benchmarks on the bundled datasets, the cache of processed datasets is kept in cache_dir.
+    """
+    spec = registry.specs['NACA 6409']
+
+    @functools.lru_cache(maxsize=None)
+    def setup():
+        # The datasets are loaded by the first benchmark which needs them
+        naca = registry['NACA 6409']
+        rng = np.random.default_rng(0)
+        aoa = rng.uniform(0, 6, BATCH_SIZE)
+        vel = rng.uniform(3, 10, BATCH_SIZE)
+        cl = naca.get_interpolated_values(aoa, vel, ['lift_coefficient'])['lift_coefficient']
+        return SimpleNamespace(naca=naca, pylon=registry['New front drags'], aoa=aoa, vel=vel, cl=cl)
+
+    boat = Boat(6, 1.6, 170, 4.3, 0.72, 0.7)
+    mass_ratios = np.linspace(0.5, 0.8, 36)
+
+    def mass_ratio_sweep():
+        # The sweep of not_centered_mass_analysis_V2
+        pylon = setup().pylon
+        masses = boat.mass_ratio_sweep(mass_ratios)
+        front_aoa = _calculate_aoa_based_on_area(0.038, 8.0, masses['front_pylon_mass'], pylon)
+        rear_aoa = _calculate_aoa_based_on_area(0.038, 8.0, masses['rear_pylon_mass'], pylon)
+        overall_front_drag_analysis(0.038, 8.0, pylon, front_aoa)
+        overall_front_drag_analysis(0.038, 8.0, pylon, rear_aoa)
+
+    return {
+        'foil_manager_procedure[NACA 6409, no cache]':
+            (lambda: foil_manager_procedure(**dict(spec, use_cache=False)), 1),
+        'foil_manager_procedure[NACA 6409, cached]':
+            (lambda: foil_manager_procedure(**dict(spec, use_cache=True, cache_dir=cache_dir)), 1),
+        'get_interpolated_value[NACA 6409, grid]':
+            (lambda: setup().naca.get_interpolated_value('lift_coefficient', 2.3, 7.7), 1),
+        'get_interpolated_value[New front drags, rbf]':
+            (lambda: setup().pylon.get_interpolated_value('drag_force_pylon', 2.3, 7.7), 1),
+        'get_interpolated_values[NACA 6409, grid, batch]':
+            (lambda: setup().naca.get_interpolated_values(setup().aoa, setup().vel,
+                                                          ['lift_coefficient', 'drag_coefficient']), BATCH_SIZE),
+        'get_interpolated_values[New front drags, rbf, batch]':
+            (lambda: setup().pylon.get_interpolated_values(setup().aoa, setup().vel), BATCH_SIZE),
+        '_find_angle_of_attack[NACA 6409]':
+            (lambda: _find_angle_of_attack(7.7, setup().cl[0], setup().naca.data), 1),
+        'AngleOfAttackSolver.solve[NACA 6409, batch]':
+            (lambda: setup().naca.get_angle_of_attack_solver().solve(setup().vel, setup().cl, strict=False),
+             BATCH_SIZE),
+        'Boat.distribution_of_masses': (lambda: boat.distribution_of_masses(2.676, 3.551, 0.725, 0.386), 1),
+        'Boat.mass_distribution_sweep[batch]':
+            (lambda: boat.mass_distribution_sweep(np.linspace(0.7, 4.3, BATCH_SIZE)), BATCH_SIZE),
+        'not_centered_mass_analysis_V2 sweep': (mass_ratio_sweep, len(mass_ratios)),
+    }
+
+
+def synthetic_benchmarks(directory, rows):
+    """
+    Benchmarks on a synthetic grid of about rows points.
+    """
+    path = Path(directory) / f'synthetic_{rows}.csv'
+
+    def load():
+        if not path.exists():
+            write_synthetic_csv(path, rows)
+        return foil_manager_procedure('CFD', 'synthetic', path, 0.03, 0.1, calculate_pressure_center=False,
+                                      use_cache=False)
+
+    @functools.lru_cache(maxsize=None)
+    def setup():
+        # The grid is written and loaded by the first benchmark which needs it
+        manager = load()
+        rng = np.random.default_rng(0)
+        aoa = rng.uniform(-5, 10, BATCH_SIZE)
+        vel = rng.uniform(0.5, 12, BATCH_SIZE)
+        cl = manager.get_interpolated_values(aoa, vel, ['lift_coefficient'])['lift_coefficient']
+        velocity = manager.data['inlet_vel'].iloc[len(manager.data) // 2]
+        return SimpleNamespace(manager=manager, aoa=aoa, vel=vel, cl=cl, velocity=velocity)
+
+    def build_interpolator():
+        manager = setup().manager
+        manager.invalidate_interpolators()
+        manager.get_interpolated_value('lift_coefficient', 1.0, 5.0)
+
+    def build_solver():
+        manager = setup().manager
+        manager.invalidate_interpolators()
+        manager.get_angle_of_attack_solver()
+
+    return {
+        f'foil_manager_procedure[synthetic {rows}]': (load, rows),
+        f'interpolator build[synthetic {rows}]': (build_interpolator, rows),
+        f'get_interpolated_values[synthetic {rows}, batch]':
+            (lambda: setup().manager.get_interpolated_values(setup().aoa, setup().vel, ['lift_coefficient']),
+             BATCH_SIZE),
+        f'AngleOfAttackSolver build[synthetic {rows}]': (build_solver, rows),
+        f'AngleOfAttackSolver.solve[synthetic {rows}, batch]':
+            (lambda: setup().manager.get_angle_of_attack_solver().solve(setup().vel, setup().cl, strict=False),
+             BATCH_SIZE),
+        f'filter_data_by_velocity[synthetic {rows}]':
+            (lambda: setup().manager.filter_data_by_velocity(setup().velocity), rows),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare the results with the baseline.
+
+    Returns:
+        list: descriptions of the regressions.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric in ['latency_s', 'peak_memory_bytes']:
+            reference = baseline[name][metric]
+            if metric == 'peak_memory_bytes' and result[metric] - reference < MEMORY_NOISE_BYTES:
+                continue
+            if reference > 0 and result[metric] > reference * (1 + tolerance):
+                regressions.append(f'{name}: {metric} {result[metric]:.4g} > baseline {reference:.4g} '
+                                   f'(+{(result[metric] / reference - 1) * 100:.0f}%)')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths of the flight model.')
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES,
+                        help='numbers of rows of the synthetic grids (default: %(default)s)')
+    parser.add_argument('--filter', default='', help='run only the benchmarks whose name contains the text')
+    parser.add_argument('--save', help='save the results as a baseline json file')
+    parser.add_argument('--compare', help='compare the results with a baseline json file saved with --save')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative growth of latency and memory over the baseline (default: %(default)s)')
+    args = parser.parse_args()
+    if args.compare and not Path(args.compare).exists():
+        parser.error(f"baseline {args.compare} doesn't exist, create it first with --save {args.compare}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The datasets are processed from the csv files and cached in the temporary directory, so the benchmarks
+        # don't depend on the cache of earlier runs
+        registry = FoilRegistry(DEFAULT_CATALOG_PATH, use_cache=False)
+        benchmarks = dataset_benchmarks(registry, directory)
+        for rows in args.sizes:
+            benchmarks.update(synthetic_benchmarks(directory, rows))
+
+        results = {}
+        print(f'{"benchmark":62s} {"latency":>12s} {"throughput":>14s} {"peak memory":>12s}')
+        for name, (function, items) in benchmarks.items():
+            if args.filter not in name:
+                continue
+            results[name] = measure(function, items)
+            print(f'{name:62s} {results[name]["latency_s"] * 1000:9.3f} ms {results[name]["throughput"]:10.4g} /s '
+                  f'{results[name]["peak_memory_bytes"] / 2 ** 20:9.2f} MB')
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) against {args.compare}:')
+            print('\n'.join(regressions))
+            sys.exit(1)
+        print(f'\nNo regressions against {args.compare}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Import-time budget check of the library modules.
+
+Every module is imported in a fresh interpreter, which has to finish within the budget, print nothing and leave
+matplotlib.pyplot, scipy and shapely unimported (the first two are imported lazily, only when plotting or
+interpolating).
+
+Usage: python -m benchmarks.import_time [--budget SECONDS]
+
+The same check runs in the test suite, see tests/test_import_time.py.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPOSITORY_DIR = Path(__file__).resolve().parent.parent
+
+# Modules which are imported by batch jobs and must not have side effects
+LIBRARY_MODULES = [
+    'src.utilities.Constants',
+    'src.utilities.Profiling',
+    'src.foils_data.AngleOfAttackSolver',
+    'src.foils_data.DataCache',
+    'src.foils_data.FoilDataset',
+    'src.foils_data.FoilManager',
+    'src.foils_data.FoilRegistry',
+    'src.foils_data.WingletAnalysis',
+    'src.boat_analysis.Results',
+    'src.boat_analysis.Boat',
+    'src.boat_analysis.PowerConsumption',
+    'src.boat_analysis.OverallAnalysis',
+    'src.boat_analysis.OperatingEnvelope',
+    'src.boat_analysis.FoilOptimization',
+    'src.boat_analysis.TakeOffAnalysis',
+    'src.boat_analysis.SpeedProfileSimulation',
+]
+
+# Modules which must not be imported as a side effect of importing a library module
+FORBIDDEN_MODULES = ['matplotlib.pyplot', 'scipy', 'shapely']
+
+# Maximal import time of a module in s
+DEFAULT_BUDGET = 1.0
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+sys.stderr.write(json.dumps({{'elapsed': elapsed, 'loaded': [name for name in {forbidden!r} if name in sys.modules]}}))
+'''
+
+
+def measure_import(module):
+    """
+    Import the module in a fresh interpreter.
+
+    Returns:
+        (elapsed time in s, list of forbidden modules which got imported, captured stdout)
+    """
+    completed = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, forbidden=FORBIDDEN_MODULES)],
+                               cwd=REPOSITORY_DIR, capture_output=True, text=True, check=True)
+    result = json.loads(completed.stderr.strip().splitlines()[-1])
+    return result['elapsed'], result['loaded'], completed.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the import time budget of the library modules.')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='maximal import time of a module in s')
+    args = parser.parse_args()
+
+    failures = []
+    for module in LIBRARY_MODULES:
+        elapsed, loaded, output = measure_import(module)
+        problems = []
+        if elapsed > args.budget:
+            problems.append(f'import took {elapsed:.3f} s')
+        if loaded:
+            problems.append(f'imported {", ".join(loaded)}')
+        if output:
+            problems.append('printed to stdout')
+
+        print(f'{module:45s} {elapsed * 1000:8.1f} ms  {"; ".join(problems) or "ok"}')
+        if problems:
+            failures.append(module)
+
+    if failures:
+        print(f'\n{len(failures)} module(s) over the import budget or with side effects: {", ".join(failures)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
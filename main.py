@@ -1,5 +1,5 @@
 from matplotlib import pyplot as plt
-from src.foils_data.FoilManager import FoilManager, foil_manager_procedure
+from src.foils_data.FoilRegistry import default_registry
 from src.foils_data.FoilPlotter import FoilPlotter, compare_foils_lift, compare_foils_drag
 from src.utilities.Constants import *
 
@@ -8,31 +8,14 @@ def main():
     # Apply a style
     plt.style.use('ggplot')
 
-    # File paths to the CSV files
-    NACA6409_CFD_path = 'data_CFD/CFD_3D_skrzydla_przednie2023_batmanowe_NACA6409_Wyniki_p.csv'
-    NACA64A715_CFD_path = 'data_CFD/CFD_3D_skrzydla_przednie2021_owalne_NACA64A715_Wyniki_p.csv'
-    EPPLER396_CFD_path = 'data_CFD/CFD_2D_EPPLER_396_WYNIKI.csv'
-    NACA6409_AFT_path = 'data_AFT/xf-n6409-il-1000000-n5.csv'
-    EPPLER908_CFD_path = 'data_CFD/CFD_3D_skrzydla_tylnie2021_eppler908_Wyniki_p.csv'
-    NACA_0_033_path = 'data_CFD/CFD_3D_naca_6409_pow_0.033.csv'
-
-    # Initialize DataManagers
+    # Initialize DataManagers, the datasets are listed in foil_catalog/foil_catalog.csv
     ############################################################
+    data_managers = default_registry().load(['NACA_0_033', 'NACA 6409', 'NACA 64A715', 'EPPLER908'])
 
-    data_manager_NACA_0_033 = foil_manager_procedure('CFD', 'NACA_0_033', NACA_0_033_path, NACA_0_033_AREA,
-                                                     NACA_0_033_CHORD_LENGTH)
-
-    ############################################################
-    data_manager_NACA6409 = foil_manager_procedure('CFD', 'NACA 6409', NACA6409_CFD_path,
-                                                   NACA6409_AREA, NACA6409_CHORD_LENGTH)
-
-    ##############################################################
-    data_manager_NACA64A715 = foil_manager_procedure('CFD', 'NACA 64A715', NACA64A715_CFD_path,
-                                                     NACA64A715_AREA, NACA64A715_CHORD_LENGTH)
-
-    ##############################################################
-    data_manager_EPPLER908 = foil_manager_procedure('CFD', 'EPPLER908', EPPLER908_CFD_path, EPPLER908_AREA, 0.0, True,
-                                                    False)
+    data_manager_NACA_0_033 = data_managers['NACA_0_033']
+    data_manager_NACA6409 = data_managers['NACA 6409']
+    data_manager_NACA64A715 = data_managers['NACA 64A715']
+    data_manager_EPPLER908 = data_managers['EPPLER908']
 
     plotter_NACA6409_CFD = FoilPlotter(data_manager_NACA6409)
     plotter_NACA64A715_CFD = FoilPlotter(data_manager_NACA64A715)
@@ -1,7 +1,12 @@
-from shapely import LineString
-from shapely.geometry import Point
+import logging
+
+import numpy as np
 import pandas as pd
 
+from src.boat_analysis.Results import MassDistribution
+
+logger = logging.getLogger(__name__)
+
 
 def read_boat_data(csv_path, row_index=0):
     """
@@ -32,6 +37,22 @@ def read_boat_data(csv_path, row_index=0):
     return boat
 
 
+def _distance_to_segment(point_x, point_y, start_x, start_y, end_x, end_y):
+    """
+    Distance of points to segments (start, end), the arguments are broadcast against each other.
+    """
+    segment_x = end_x - start_x
+    segment_y = end_y - start_y
+    length_squared = segment_x ** 2 + segment_y ** 2
+
+    # Position of the projection of the point on the segment, clamped to the ends of the segment
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = ((point_x - start_x) * segment_x + (point_y - start_y) * segment_y) / length_squared
+    t = np.clip(np.nan_to_num(t), 0.0, 1.0)
+
+    return np.hypot(point_x - (start_x + t * segment_x), point_y - (start_y + t * segment_y))
+
+
 class Boat:
     def __init__(self, length, width, mass, front_pylons_x_position=0,
                  front_pylons_y_width=0, rear_pylon_x_position=0, mass_center_x_position=0, rear_pylon_mass=0.0,
@@ -77,6 +98,7 @@ class Boat:
         :param front_pylons_x_position:
         :param front_pylons_y_width:
         :param rear_pylon_x_position:
+        :return: MassDistribution
         """
         self.front_pylons_x_position = front_pylons_x_position
         self.front_pylons_y_width = front_pylons_y_width
@@ -91,10 +113,52 @@ class Boat:
         # Calculation of position of mass center
         self.mass_center_x_position = front_pylons_x_position - (front_pylons_x_position - rear_pylon_x_position) * (
                 self.rear_pylon_mass / self.mass)
-        print('the calculated mass center based of distribution:\nfront', front_pylons_mass_ratio, '\nrear: ',
-              1 - front_pylons_mass_ratio)
+        logger.info('the calculated mass center based of distribution: front %s, rear: %s', front_pylons_mass_ratio,
+                    1 - front_pylons_mass_ratio)
+        logger.info("Mass center on x axis is: %s", self.mass_center_x_position)
+
+        return MassDistribution(self.rear_pylon_mass, self.front_pylon_right_mass, self.front_pylon_left_mass,
+                                self.mass_center_x_position)
+
+    def mass_ratio_sweep(self, front_pylons_mass_ratios, front_pylons_x_positions=None, rear_pylon_x_positions=None,
+                         masses=None):
+        """
+        Vectorized version of center_of_mass_based_on_front_rear_mass_ratio, which calculates the masses carried by
+        pylons and the position of center of mass for many configurations at once. The Boat isn't modified.
+
+        The arguments are broadcast against each other, the ones not given are taken from the Boat.
+
+        :param front_pylons_mass_ratios: the ratios (0 - 1) of the mass carried by front pylons
+        :param front_pylons_x_positions: positions of front pylons in 'x' axis [m]
+        :param rear_pylon_x_positions: positions of rear pylon in 'x' axis [m]
+        :param masses: total masses of the Boat [kg]
+        :return: dictionary of arrays shaped like the broadcast arguments: front_pylon_mass (mass on each of the front
+            pylons), rear_pylon_mass, mass_center_x_position
+        """
+        if front_pylons_x_positions is None:
+            front_pylons_x_positions = self.front_pylons_x_position
+        if rear_pylon_x_positions is None:
+            rear_pylon_x_positions = self.rear_pylon_x_position
+        if masses is None:
+            masses = self.mass
+
+        front_pylons_mass_ratios, front_pylons_x_positions, rear_pylon_x_positions, masses = np.broadcast_arrays(
+            *(np.asarray(value, dtype='float64') for value in
+              (front_pylons_mass_ratios, front_pylons_x_positions, rear_pylon_x_positions, masses)))
+
+        # Calculation of pylons masses
+        front_pylon_mass = (masses * front_pylons_mass_ratios) / 2
+        rear_pylon_mass = masses - 2 * front_pylon_mass
 
-        print("Mass center on x axis is: ", self.mass_center_x_position)
+        # Calculation of position of mass center
+        mass_center_x_position = front_pylons_x_positions - (front_pylons_x_positions - rear_pylon_x_positions) * (
+                rear_pylon_mass / masses)
+
+        return {
+            "front_pylon_mass": front_pylon_mass,
+            "rear_pylon_mass": rear_pylon_mass,
+            "mass_center_x_position": mass_center_x_position
+        }
 
     def distribution_of_masses(self, mass_center_x_position, front_pylons_x_position, front_pylons_y_width,
                                rear_pylon_x_position):
@@ -115,6 +179,7 @@ class Boat:
         :param front_pylons_x_position: position of front pylons in 'x' axis
         :param front_pylons_y_width: distance between 'x' axis and front pylon
         :param rear_pylon_x_position: position of rear pylon in 'x' axis
+        :return: MassDistribution
         """
 
         self.mass_center_x_position = mass_center_x_position
@@ -122,37 +187,80 @@ class Boat:
         self.front_pylons_y_width = front_pylons_y_width
         self.rear_pylon_x_position = rear_pylon_x_position
 
-        # assert points
-        rear_pylon_pos = Point(0.0, rear_pylon_x_position)
-        front_pylon_right_pos = Point(front_pylons_y_width, front_pylons_x_position)
-        front_pylon_left_pos = Point(-front_pylons_y_width, front_pylons_x_position)
-        mass_center_pos = Point(0.0, self.mass_center_x_position)
-
-        # calculate for rear pylon
-        line_2_3 = LineString([front_pylon_right_pos, front_pylon_left_pos])
-        d_2_3 = mass_center_pos.distance(line_2_3)
-        h_2_3 = rear_pylon_pos.distance(line_2_3)
-        self.rear_pylon_mass = self.mass * (d_2_3 / h_2_3)
-
-        # calculate for front right pylon
-        line_3_1 = LineString([front_pylon_left_pos, rear_pylon_pos])
-        d_3_1 = mass_center_pos.distance(line_3_1)
-        h_3_1 = front_pylon_right_pos.distance(line_3_1)
-        self.front_pylon_right_mass = self.mass * (d_3_1 / h_3_1)
-
-        # calculate for front left pylon
-        line_1_2 = LineString([rear_pylon_pos, front_pylon_right_pos])
-        d_1_2 = mass_center_pos.distance(line_1_2)
-        h_1_2 = front_pylon_left_pos.distance(line_1_2)
-        self.front_pylon_left_mass = self.mass * (d_1_2 / h_1_2)
-
-        # Create and return the dictionary of mass distribution
-        mass_distribution = {
-            "rear_pylon_mass": self.rear_pylon_mass,
-            "front_pylon_right_mass": self.front_pylon_right_mass,
-            "front_pylon_left_mass": self.front_pylon_left_mass
+        mass_distribution = self.mass_distribution_sweep(mass_center_x_position)
+        self.rear_pylon_mass = float(mass_distribution["rear_pylon_mass"])
+        self.front_pylon_right_mass = float(mass_distribution["front_pylon_right_mass"])
+        self.front_pylon_left_mass = float(mass_distribution["front_pylon_left_mass"])
+
+        # Create and return the record of mass distribution
+        mass_distribution = MassDistribution(self.rear_pylon_mass, self.front_pylon_right_mass,
+                                             self.front_pylon_left_mass, self.mass_center_x_position)
+        logger.info("%s", mass_distribution)
+        return mass_distribution
+
+    def mass_distribution_sweep(self, mass_center_x_positions, front_pylons_x_positions=None,
+                                front_pylons_y_widths=None, rear_pylon_x_positions=None, masses=None):
+        """
+        Vectorized version of distribution_of_masses, which calculates the masses carried by pylons for many positions
+        of mass center and layouts of pylons at once. The Boat isn't modified.
+
+        The pylons form a triangle: rear pylon 1 at (0, rear_pylon_x_position), front right pylon 2 at
+        (front_pylons_y_width, front_pylons_x_position) and front left pylon 3 at (-front_pylons_y_width,
+        front_pylons_x_position). The reaction of a pylon is R = P * d / h, where d is the distance of the load to the
+        opposite side of the triangle and h is the height of the triangle with respect to that side.
+
+        The arguments are broadcast against each other, the ones not given are taken from the Boat.
+
+        :param mass_center_x_positions: positions of mass center in 'x' axis [m]
+        :param front_pylons_x_positions: positions of front pylons in 'x' axis [m]
+        :param front_pylons_y_widths: distances between 'x' axis and front pylons [m]
+        :param rear_pylon_x_positions: positions of rear pylon in 'x' axis [m]
+        :param masses: total masses of the Boat [kg]
+        :return: dictionary of arrays shaped like the broadcast arguments: rear_pylon_mass, front_pylon_right_mass,
+            front_pylon_left_mass
+        """
+        if front_pylons_x_positions is None:
+            front_pylons_x_positions = self.front_pylons_x_position
+        if front_pylons_y_widths is None:
+            front_pylons_y_widths = self.front_pylons_y_width
+        if rear_pylon_x_positions is None:
+            rear_pylon_x_positions = self.rear_pylon_x_position
+        if masses is None:
+            masses = self.mass
+
+        mass_center_y, front_y, front_x, rear_y, masses = np.broadcast_arrays(
+            *(np.asarray(value, dtype='float64') for value in
+              (mass_center_x_positions, front_pylons_x_positions, front_pylons_y_widths, rear_pylon_x_positions,
+               masses)))
+        zeros = np.zeros_like(mass_center_y)
+
+        # Points in (y, x) coordinates of the plane of the boat
+        rear_pylon_pos = (zeros, rear_y)
+        front_pylon_right_pos = (front_x, front_y)
+        front_pylon_left_pos = (-front_x, front_y)
+        mass_center_pos = (zeros, mass_center_y)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # calculate for rear pylon, side 2-3
+            rear_pylon_mass = masses * (
+                    _distance_to_segment(*mass_center_pos, *front_pylon_right_pos, *front_pylon_left_pos) /
+                    _distance_to_segment(*rear_pylon_pos, *front_pylon_right_pos, *front_pylon_left_pos))
+
+            # calculate for front right pylon, side 3-1
+            front_pylon_right_mass = masses * (
+                    _distance_to_segment(*mass_center_pos, *front_pylon_left_pos, *rear_pylon_pos) /
+                    _distance_to_segment(*front_pylon_right_pos, *front_pylon_left_pos, *rear_pylon_pos))
+
+            # calculate for front left pylon, side 1-2
+            front_pylon_left_mass = masses * (
+                    _distance_to_segment(*mass_center_pos, *rear_pylon_pos, *front_pylon_right_pos) /
+                    _distance_to_segment(*front_pylon_left_pos, *rear_pylon_pos, *front_pylon_right_pos))
+
+        return {
+            "rear_pylon_mass": rear_pylon_mass,
+            "front_pylon_right_mass": front_pylon_right_mass,
+            "front_pylon_left_mass": front_pylon_left_mass
         }
-        print(mass_distribution)
 
 
 def calculate_mass_center_based_on_distribution(boat: Boat, front_pylons_mass_ratio):
@@ -0,0 +1,218 @@
+import logging
+
+import numpy as np
+
+from src.boat_analysis.Boat import Boat
+from src.boat_analysis.PowerConsumption import power_consumption
+from src.foils_data.FoilManager import FoilManager
+from src.foils_data.FoilRegistry import default_registry
+from src.utilities.Constants import *
+
+# Module to find the angles of attack (and hence the areas) of foils which minimize the drag of the boat
+
+# Results of the analyses are logged on INFO level
+logger = logging.getLogger(__name__)
+
+# Drag forces of the parts other than the foil, added to the foil drag when they are in the data
+PART_DRAG_COLUMNS = ['drag_force_pylon', 'drag_force_mocowanie', 'drag_force_gondola']
+
+# Number of angles of attack of the coarse search, which gives the starting points of the optimization
+COARSE_SEARCH_POINTS = 61
+
+# Width of the interval of angles of attack [deg] at which the golden-section refinement stops
+REFINEMENT_TOLERANCE = 1e-6
+
+# Ratio of the golden section, (sqrt(5) - 1) / 2
+_GOLDEN_RATIO = (np.sqrt(5) - 1) / 2
+
+
+def _pylon_drag(foilManager: FoilManager, pylon_mass, velocities, angles_of_attack):
+    """
+    Drag of the foil (with the area that carries the pylon mass) and the other parts of a pylon.
+
+    The foil area is area = 2 * m * g / (density * v^2 * cl), so the foil drag is m * g * cd / cl. Angles of attack
+    with non-positive lift coefficient can't carry the mass, their drag is inf.
+    """
+    part_columns = [column for column in PART_DRAG_COLUMNS if column in foilManager.dataset]
+    values = foilManager.get_interpolated_values(angles_of_attack, velocities,
+                                                 ['lift_coefficient', 'drag_coefficient'] + part_columns)
+
+    lift_coefficient = values['lift_coefficient']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drag = np.where(lift_coefficient > 0,
+                        pylon_mass * GRAVITATIONAL_ACCELERATION * values['drag_coefficient'] / lift_coefficient,
+                        np.inf)
+    for column in part_columns:
+        drag = drag + values[column]
+    return drag, lift_coefficient
+
+
+def _coarse_search(foilManager: FoilManager, pylon_mass, velocities):
+    """
+    Evaluate the pylon drag on a grid of angles of attack covering the data, for all velocities at once.
+
+    :return: grid of angles, index of the best angle for every velocity, drag of shape (angles, velocities)
+    """
+    angles = foilManager.dataset.angle_axis
+    grid = np.linspace(angles[0], angles[-1], COARSE_SEARCH_POINTS)
+    drag, _ = _pylon_drag(foilManager, pylon_mass, velocities[None, :], grid[:, None])
+    return grid, np.argmin(drag, axis=0), drag
+
+
+def _bounds_around(grid, drag, best):
+    """
+    Bounds of the refinement: the neighbouring angles of the coarse grid, as long as the pylon can fly there.
+
+    :param grid: angles of attack of the coarse search.
+    :param drag: drag of shape (angles, velocities) from the coarse search.
+    :param best: index of the best angle for every velocity.
+    :return: lower and upper bound for every velocity
+    """
+    columns = np.arange(len(best))
+    lower = np.maximum(best - 1, 0)
+    upper = np.minimum(best + 1, len(grid) - 1)
+    lower = np.where(np.isfinite(drag[lower, columns]), lower, best)
+    upper = np.where(np.isfinite(drag[upper, columns]), upper, best)
+    return grid[lower], grid[upper]
+
+
+def _golden_section_search(foilManager: FoilManager, pylon_mass, velocities, lower, upper):
+    """
+    Minimize the pylon drag over the angle of attack between the bounds, for all velocities at once.
+
+    Every iteration of the golden-section search shrinks the intervals of all velocities by the golden ratio, so they
+    take the same number of iterations and every iteration is a single batch of interpolation.
+
+    :return: angle of attack of the lowest drag for every velocity
+    """
+    width = max(np.max(upper - lower, initial=0.0), REFINEMENT_TOLERANCE)
+    iterations = int(np.ceil(np.log(REFINEMENT_TOLERANCE / width) / np.log(_GOLDEN_RATIO)))
+
+    left = upper - _GOLDEN_RATIO * (upper - lower)
+    right = lower + _GOLDEN_RATIO * (upper - lower)
+    left_drag, _ = _pylon_drag(foilManager, pylon_mass, velocities, left)
+    right_drag, _ = _pylon_drag(foilManager, pylon_mass, velocities, right)
+    for _ in range(iterations):
+        # The minimum is in [lower, right] where the left point is better, otherwise in [left, upper]
+        left_better = left_drag < right_drag
+        upper = np.where(left_better, right, upper)
+        lower = np.where(left_better, lower, left)
+
+        # One of the inner points is kept, only the other one is evaluated
+        keep = np.where(left_better, left, right)
+        keep_drag = np.where(left_better, left_drag, right_drag)
+        new = np.where(left_better, upper - _GOLDEN_RATIO * (upper - lower), lower + _GOLDEN_RATIO * (upper - lower))
+        new_drag, _ = _pylon_drag(foilManager, pylon_mass, velocities, new)
+
+        left = np.where(left_better, new, keep)
+        left_drag = np.where(left_better, new_drag, keep_drag)
+        right = np.where(left_better, keep, new)
+        right_drag = np.where(left_better, keep_drag, new_drag)
+
+    return np.where(left_drag < right_drag, left, right)
+
+
+def optimize_angles_of_attack_batch(target_velocities, boat: Boat, frontFoilManager: FoilManager,
+                                    rearFoilManager: FoilManager, efficiency=1.0):
+    """
+    Find the angles of attack of front and rear foils which minimize the total drag of the boat, for many target
+    velocities at once. The foil areas follow from the angles of attack, so that the foils carry the masses on the
+    pylons of the boat. At given velocity the power (power_consumption) is proportional to the drag, so the same angles
+    minimize the power, which is reported for given efficiency of the drive.
+
+    The search is derivative-free: the drag of every pylon is first evaluated on a coarse grid of angles of attack for
+    all velocities in one batch of interpolation, then the best angles are refined with a golden-section search between
+    the neighbouring angles of the grid, also for all velocities at once. It needs only the interpolated values, which
+    are not smooth everywhere (linear grid interpolation, clamping at the ends of the data), and it can't step out of
+    the bracket of the coarse minimum into angles where the foil doesn't produce lift. The total drag is
+    2 * front pylon drag + rear pylon drag, so the angles of front and rear foils are refined separately.
+
+    :param target_velocities: velocities for which the boat is designed [m/s]
+    :param boat: Boat model, front_pylon_left_mass and rear_pylon_mass are used.
+    :param frontFoilManager: container of front foils (and their pylons) data.
+    :param rearFoilManager: container of rear foil (and its pylon) data.
+    :param efficiency: efficiency of the drive, used for the reported power.
+    :return: dictionary of arrays shaped like target_velocities: velocity, front_aoa, rear_aoa, front_foil_area,
+        rear_foil_area, total_drag, power
+    """
+    target_velocities = np.asarray(target_velocities, dtype='float64')
+    shape = target_velocities.shape
+    velocities = target_velocities.ravel()
+
+    front_grid, front_best, front_drag = _coarse_search(frontFoilManager, boat.front_pylon_left_mass, velocities)
+    rear_grid, rear_best, rear_drag = _coarse_search(rearFoilManager, boat.rear_pylon_mass, velocities)
+
+    front_aoa = _golden_section_search(frontFoilManager, boat.front_pylon_left_mass, velocities,
+                                       *_bounds_around(front_grid, front_drag, front_best))
+    rear_aoa = _golden_section_search(rearFoilManager, boat.rear_pylon_mass, velocities,
+                                      *_bounds_around(rear_grid, rear_drag, rear_best))
+
+    # Velocities at which one of the foils doesn't produce lift at any angle of attack
+    columns = np.arange(len(velocities))
+    flying = np.isfinite(front_drag[front_best, columns]) & np.isfinite(rear_drag[rear_best, columns])
+    front_aoa = np.where(flying, front_aoa, np.nan)
+    rear_aoa = np.where(flying, rear_aoa, np.nan)
+
+    front_pylon_drag, front_lift_coefficient = _pylon_drag(frontFoilManager, boat.front_pylon_left_mass, velocities,
+                                                           np.nan_to_num(front_aoa))
+    rear_pylon_drag, rear_lift_coefficient = _pylon_drag(rearFoilManager, boat.rear_pylon_mass, velocities,
+                                                         np.nan_to_num(rear_aoa))
+    solved = ~np.isnan(front_aoa)
+    total_drag = np.where(solved, 2 * front_pylon_drag + rear_pylon_drag, np.nan)
+
+    results = {
+        'velocity': velocities,
+        'front_aoa': front_aoa,
+        'rear_aoa': rear_aoa,
+        'front_foil_area': np.where(solved, (2 * boat.front_pylon_left_mass * GRAVITATIONAL_ACCELERATION) / (
+                WATER_DENSITY * velocities ** 2 * front_lift_coefficient), np.nan),
+        'rear_foil_area': np.where(solved, (2 * boat.rear_pylon_mass * GRAVITATIONAL_ACCELERATION) / (
+                WATER_DENSITY * velocities ** 2 * rear_lift_coefficient), np.nan),
+        'total_drag': total_drag,
+        'power': power_consumption(total_drag, velocities, efficiency),
+    }
+    return {name: values.reshape(shape) for name, values in results.items()}
+
+
+def optimize_angles_of_attack(target_velocity, boat: Boat, frontFoilManager: FoilManager,
+                              rearFoilManager: FoilManager, efficiency=1.0):
+    """
+    Find the angles of attack of front and rear foils which minimize the total drag of the boat at the target
+    velocity, see optimize_angles_of_attack_batch.
+
+    :return: dictionary with: velocity, front_aoa, rear_aoa, front_foil_area, rear_foil_area, total_drag, power
+    """
+    results = optimize_angles_of_attack_batch(target_velocity, boat, frontFoilManager, rearFoilManager, efficiency)
+    return {name: float(values) for name, values in results.items()}
+
+
+def optimal_foils_analysis():
+    """
+    Optimal angles of attack and foil areas of the Delta boat over its range of velocities.
+    """
+    # Delta Parameters:
+    mass = 170
+    front_pylon_x_position = 4.3
+    front_pylon_y_width = 0.72
+    rear_pylon_x_position = 0.7
+    equal_mass_ratio = 0.666666
+    ############################
+
+    Delta = Boat(6, 1.6, mass, front_pylon_x_position, front_pylon_y_width, rear_pylon_x_position)
+    masses = Delta.mass_ratio_sweep(equal_mass_ratio)
+    Delta.front_pylon_left_mass = Delta.front_pylon_right_mass = float(masses['front_pylon_mass'])
+    Delta.rear_pylon_mass = float(masses['rear_pylon_mass'])
+
+    data_manager_New_Boat_drags = default_registry()['New front drags']
+
+    results = optimize_angles_of_attack_batch(np.linspace(6, 10, 9), Delta, data_manager_New_Boat_drags,
+                                              data_manager_New_Boat_drags)
+    for idx, velocity in enumerate(results['velocity']):
+        logger.info('v = %.1f m/s: front aoa = %.2f, rear aoa = %.2f, front foil area = %.5f, rear foil area = %.5f, '
+                    'total drag = %.2f', velocity, results['front_aoa'][idx], results['rear_aoa'][idx],
+                    results['front_foil_area'][idx], results['rear_foil_area'][idx], results['total_drag'][idx])
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    optimal_foils_analysis()
@@ -0,0 +1,150 @@
+import numpy as np
+
+from src.boat_analysis.Boat import Boat
+from src.boat_analysis.OverallAnalysis import (design_foil_areas, overall_front_drag_analysis,
+                                               overall_rear_drag_analysis)
+from src.boat_analysis.PowerConsumption import power_consumption
+from src.foils_data.FoilManager import FoilManager
+from src.foils_data.FoilRegistry import default_registry
+from src.utilities.Constants import *
+
+# Module to map the drag and power of the boat over the whole range of velocities and mass distributions
+
+
+def _trim_angle_of_attack(foil_area, velocities, pylon_masses, foilManager: FoilManager):
+    """
+    Angles of attack at which the foils carry the masses on the pylons, NaN where the required lift coefficient is
+    outside of the data.
+    """
+    lift_coefficient = (2 * pylon_masses * GRAVITATIONAL_ACCELERATION) / (
+            WATER_DENSITY * foil_area * velocities ** 2)
+
+    return foilManager.get_angle_of_attack_solver().solve(velocities, lift_coefficient, strict=False)
+
+
+def flight_state(velocities, front_pylon_masses, rear_pylon_masses, front_foil_area, rear_foil_area,
+                 front_parts_manager: FoilManager, rear_parts_manager: FoilManager, efficiency=1.0):
+    """
+    Evaluate the whole flight model (trim angles of attack, drag of all parts and power) for many flight conditions
+    at once.
+
+    The trim angles of attack of all conditions are solved at once and the drags are interpolated in one batch per
+    foil, only for the feasible conditions. A condition is infeasible when the lift coefficient required by any of the
+    foils is outside of the range available in the data at that velocity, then all its results are NaN.
+
+    If the rear parts data has no gondola drag (e.g. front drags data used for the rear pylon), the gondola drag is 0.
+
+    :param velocities: velocities [m/s]
+    :param front_pylon_masses: masses on each of the front pylons [kg], broadcast against the velocities.
+    :param rear_pylon_masses: masses on the rear pylon [kg], broadcast against the velocities.
+    :param front_foil_area: area of a single front foil [m^2]
+    :param rear_foil_area: area of the rear foil [m^2]
+    :param front_parts_manager: container of front foils, pylons and mountings data.
+    :param rear_parts_manager: container of rear foil, pylon and mounting data.
+    :param efficiency: efficiency of the drive, passed to power_consumption.
+    :return: dictionary of arrays shaped like the broadcast arguments: front_aoa, rear_aoa, front_foil_drag,
+        front_pylon_drag, front_mocowanie_drag, rear_foil_drag, rear_pylon_drag, rear_mocowanie_drag, gondola_drag,
+        total_drag, power and the boolean feasible mask.
+    """
+    velocity, front_pylon_masses, rear_pylon_masses = np.broadcast_arrays(
+        *(np.asarray(value, dtype='float64') for value in (velocities, front_pylon_masses, rear_pylon_masses)))
+
+    front_aoa = _trim_angle_of_attack(front_foil_area, velocity, front_pylon_masses, front_parts_manager)
+    rear_aoa = _trim_angle_of_attack(rear_foil_area, velocity, rear_pylon_masses, rear_parts_manager)
+    feasible = ~np.isnan(front_aoa) & ~np.isnan(rear_aoa)
+
+    state = {
+        'front_aoa': np.where(feasible, front_aoa, np.nan),
+        'rear_aoa': np.where(feasible, rear_aoa, np.nan),
+    }
+
+    # Drags are interpolated only for the feasible conditions
+    feasible_velocity = velocity[feasible]
+    front_drags = overall_front_drag_analysis(front_foil_area, feasible_velocity, front_parts_manager,
+                                              front_aoa[feasible])
+    if 'drag_force_gondola' in rear_parts_manager.dataset:
+        rear_drags = overall_rear_drag_analysis(rear_foil_area, feasible_velocity, rear_parts_manager,
+                                                rear_aoa[feasible])
+    else:
+        rear_drags = overall_front_drag_analysis(rear_foil_area, feasible_velocity, rear_parts_manager,
+                                                 rear_aoa[feasible]) + (0.0,)
+
+    names = ['front_foil_drag', 'front_pylon_drag', 'front_mocowanie_drag',
+             'rear_foil_drag', 'rear_pylon_drag', 'rear_mocowanie_drag', 'gondola_drag']
+    for name, drag in zip(names, front_drags + rear_drags):
+        state[name] = np.full(velocity.shape, np.nan)
+        state[name][feasible] = drag
+
+    # The boat has two front pylons and one rear pylon
+    state['total_drag'] = 2 * (state['front_foil_drag'] + state['front_pylon_drag'] + state['front_mocowanie_drag']) + \
+        state['rear_foil_drag'] + state['rear_pylon_drag'] + state['rear_mocowanie_drag'] + state['gondola_drag']
+    state['power'] = power_consumption(state['total_drag'], velocity, efficiency)
+    state['feasible'] = feasible
+
+    return state
+
+
+def operating_envelope(velocities, front_mass_ratios, boat: Boat, front_foil_area, rear_foil_area,
+                       front_parts_manager: FoilManager, rear_parts_manager: FoilManager, efficiency=1.0):
+    """
+    Evaluate the whole flight model (see flight_state) on a grid of velocities and ratios of mass carried by the front
+    pylons.
+
+    :param velocities: 1D array of velocities [m/s]
+    :param front_mass_ratios: 1D array of ratios (0 - 1) of the mass carried by front pylons
+    :param boat: Boat model, its mass and positions of pylons are used.
+    :param front_foil_area: area of a single front foil [m^2]
+    :param rear_foil_area: area of the rear foil [m^2]
+    :param front_parts_manager: container of front foils, pylons and mountings data.
+    :param rear_parts_manager: container of rear foil, pylon and mounting data.
+    :param efficiency: efficiency of the drive, passed to power_consumption.
+    :return: dictionary of arrays of shape (len(velocities), len(front_mass_ratios)): velocity, front_mass_ratio and
+        the results of flight_state.
+    """
+    velocity, front_mass_ratio = np.meshgrid(np.asarray(velocities, dtype='float64'),
+                                             np.asarray(front_mass_ratios, dtype='float64'), indexing='ij')
+    masses = boat.mass_ratio_sweep(front_mass_ratio)
+
+    envelope = {
+        'velocity': velocity,
+        'front_mass_ratio': front_mass_ratio,
+    }
+    envelope.update(flight_state(velocity, masses['front_pylon_mass'], masses['rear_pylon_mass'], front_foil_area,
+                                 rear_foil_area, front_parts_manager, rear_parts_manager, efficiency))
+    return envelope
+
+
+def operating_envelope_analysis():
+    """
+    Map of power of the Delta boat with the foils designed in not_centered_mass_analysis_V2.
+    """
+    # Delta Parameters:
+    mass = 170
+    front_pylon_x_position = 4.3
+    front_pylon_y_width = 0.72
+    rear_pylon_x_position = 0.7
+    ############################
+
+    Delta = Boat(6, 1.6, mass, front_pylon_x_position, front_pylon_y_width, rear_pylon_x_position)
+    data_manager_New_Boat_drags = default_registry()['New front drags']
+
+    # Foil areas designed for 8 m/s at 0 deg with 2/3 of the mass on front pylons
+    rear_foil_area, front_foil_area = design_foil_areas(Delta, data_manager_New_Boat_drags)
+
+    velocities = np.linspace(5, 10, 200)
+    mass_ratios = np.linspace(0.5, 0.8, 200)
+    envelope = operating_envelope(velocities, mass_ratios, Delta, front_foil_area, rear_foil_area,
+                                  data_manager_New_Boat_drags, data_manager_New_Boat_drags)
+
+    from matplotlib import pyplot as plt
+    plt.figure(figsize=(10, 6))
+    contour = plt.contourf(envelope['velocity'], envelope['front_mass_ratio'], envelope['power'], levels=30)
+    plt.colorbar(contour, label='Power (W)')
+    plt.title('Power over the operating envelope (white - required lift coefficient out of data)')
+    plt.xlabel('Velocity (m/s)')
+    plt.ylabel('Mass Ratio (Front Mass / Total Mass)')
+    plt.show()
+
+
+if __name__ == '__main__':
+    operating_envelope_analysis()
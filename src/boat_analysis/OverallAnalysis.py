@@ -1,75 +1,49 @@
+import argparse
+import logging
+from functools import lru_cache
+
 import numpy as np
-from matplotlib import pyplot as plt, cm
-from scipy.interpolate import Rbf, LinearNDInterpolator, interp2d
-from scipy.optimize import fsolve
 
 from src.boat_analysis.Boat import Boat, read_boat_data
 from src.boat_analysis.PowerConsumption import power_consumption
+from src.boat_analysis.Results import FoilAreaResult, LiftAnalysisResult
+from src.foils_data.AngleOfAttackSolver import AngleOfAttackSolver
 from src.foils_data.FoilManager import FoilManager
-from src.foils_data.FoilPlotter import FoilPlotter
+from src.foils_data.FoilRegistry import default_registry
 from src.utilities.Constants import *
 from pathlib import Path
 
+# matplotlib and FoilPlotter are imported inside the functions which plot, so importing this module stays cheap and
+# doesn't need a display
+
 
 # Module to realize the algorithm of modelling a flight
 
+# Intermediate results of the analyses are logged on INFO level, the command line entry point shows them
+logger = logging.getLogger(__name__)
+
+# Number of decimal places to which the arguments of the memoized analyses are rounded, so repeated queries of the
+# same point share the result
+MEMOIZE_DECIMALS = 6
+
+# Maximal number of results kept by every memoized analysis, the least recently used ones are evicted
+MEMOIZE_SIZE = 4096
+
 def _calculate_aoa_based_on_area(target_foil_area, target_velocity, pylon_mass, foilManager: FoilManager):
     """
     Method to calculate aoa based on the given foil area, to produce given Lift Force.
+
+    The arguments can be arrays, then the angles of attack are solved for all of them at once.
     """
     # Calculate lift_coefficient using formula
     lift_coefficient = (2 * pylon_mass * GRAVITATIONAL_ACCELERATION) / (
             WATER_DENSITY * target_foil_area * pow(target_velocity, 2))
 
-    return _find_angle_of_attack(target_velocity, lift_coefficient, foilManager.data)
+    return foilManager.get_angle_of_attack_solver().solve(target_velocity, lift_coefficient)
 
 
 def _find_angle_of_attack(inlet_vel, desired_lift_coefficient, df):
-    # Get unique angle_of_attack values
-    angle_of_attack_unique = np.unique(df['angle_of_attack'].values)
-
-    lift_coeff_list = []
-
-    for angle in angle_of_attack_unique:
-        # Get data for this angle_of_attack
-        df_angle = df[df['angle_of_attack'] == angle]
-        inlet_vels = df_angle['inlet_vel'].values
-        lift_coeffs = df_angle['lift_coefficient'].values
-
-        # Check if inlet_vel is within the range for this angle
-        if inlet_vel < inlet_vels.min() or inlet_vel > inlet_vels.max():
-            # Cannot interpolate, skip this angle
-            continue
-
-        # Interpolate lift_coefficient at desired inlet_vel
-        lift_coeff_interp = np.interp(inlet_vel, inlet_vels, lift_coeffs)
-        lift_coeff_list.append((angle, lift_coeff_interp))
-
-    if not lift_coeff_list:
-        raise ValueError(f"No data available to interpolate for inlet_vel={inlet_vel}")
-
-    # Now, we have lift_coefficient vs angle_of_attack at the desired inlet_vel
-    angles = np.array([item[0] for item in lift_coeff_list])
-    lift_coeffs = np.array([item[1] for item in lift_coeff_list])
-
-    # Check if desired_lift_coefficient is within the range
-    lift_coeff_min = lift_coeffs.min()
-    lift_coeff_max = lift_coeffs.max()
-
-    if desired_lift_coefficient < lift_coeff_min or desired_lift_coefficient > lift_coeff_max:
-        raise ValueError(
-            f"Desired lift coefficient {desired_lift_coefficient} is outside the achievable range "
-            f"[{lift_coeff_min}, {lift_coeff_max}] at inlet_vel={inlet_vel}"
-        )
-
-    # Interpolate angle_of_attack as a function of lift_coefficient
-    sorted_indices = np.argsort(lift_coeffs)
-    lift_coeffs_sorted = lift_coeffs[sorted_indices]
-    angles_sorted = angles[sorted_indices]
-
-    angle_interp = np.interp(desired_lift_coefficient, lift_coeffs_sorted, angles_sorted)
-
-    return angle_interp
+    return AngleOfAttackSolver.from_data(df).solve(inlet_vel, desired_lift_coefficient)
 
 
 def _calculate_foil_area(target_angle_of_attack, target_velocity, pylon_mass, foilManager: FoilManager):
@@ -81,17 +55,21 @@ def _calculate_foil_area(target_angle_of_attack, target_velocity, pylon_mass, fo
     :param target_velocity: velocity for which the flight is being calculated.
     :param target_angle_of_attack: angle of attack for which the flight is calculated.
     :param foilManager: container with selected foil data.
-    :return: foil_area
+    :return: FoilAreaResult, the arguments can be arrays, then lift_coefficient and foil_area are arrays of their
+        broadcast shape
     """
     # data preparation
-    lift_coefficient = foilManager.get_interpolated_lift_coefficient(target_angle_of_attack, target_velocity)
+    # [()] gives a scalar for scalar arguments and keeps the arrays
+    lift_coefficient = np.asarray(
+        foilManager.get_interpolated_lift_coefficient(target_angle_of_attack, target_velocity))[()]
 
     lift_force = pylon_mass * GRAVITATIONAL_ACCELERATION
 
     foil_area = (2 * lift_force) / (WATER_DENSITY * pow(target_velocity, 2) * lift_coefficient)
-    print('Area for the foil: ', foilManager.foil_name, ' is: ', foil_area, 'm^2')
+    logger.info('Area for the foil: %s is: %s m^2', foilManager.foil_name, foil_area)
 
-    return foil_area
+    return FoilAreaResult(foilManager.foil_name, target_velocity, target_angle_of_attack, pylon_mass, lift_coefficient,
+                          foil_area)
 
 
 def foils_drag_analysis(rear_foil_area, front_foil_area, target_velocity, frontFoilManager: FoilManager,
@@ -119,29 +97,26 @@ def foils_drag_analysis(rear_foil_area, front_foil_area, target_velocity, frontF
 
 def overall_front_drag_analysis(front_foil_area, target_velocity, front_parts_manager: FoilManager,
                                 front_target_angle_of_attack):
-    front_foil_drag = (1 / 2) * WATER_DENSITY * pow(target_velocity,
-                                                    2) * front_foil_area * front_parts_manager.get_interpolated_drag_coefficient(
-        front_target_angle_of_attack, target_velocity)
+    values = front_parts_manager.get_interpolated_values(
+        front_target_angle_of_attack, target_velocity, ['drag_coefficient', 'drag_force_pylon', 'drag_force_mocowanie'])
 
-    front_pylon_drag = front_parts_manager.get_interpolated_drag_force_pylon(front_target_angle_of_attack,
-                                                                             target_velocity)
-    front_mocowanie_drag = front_parts_manager.get_interpolated_drag_force_mocowanie(front_target_angle_of_attack,
-                                                                                     target_velocity)
+    front_foil_drag = (1 / 2) * WATER_DENSITY * pow(target_velocity, 2) * front_foil_area * values['drag_coefficient']
+    front_pylon_drag = values['drag_force_pylon']
+    front_mocowanie_drag = values['drag_force_mocowanie']
 
     return front_foil_drag, front_pylon_drag, front_mocowanie_drag
 
 
 def overall_rear_drag_analysis(rear_foil_area, target_velocity, rear_parts_manager: FoilManager,
                                rear_target_angle_of_attack=0):
-    rear_foil_drag = (1 / 2) * WATER_DENSITY * pow(target_velocity,
-                                                   2) * rear_foil_area * rear_parts_manager.get_interpolated_drag_coefficient(
-        rear_target_angle_of_attack, target_velocity)
+    values = rear_parts_manager.get_interpolated_values(
+        rear_target_angle_of_attack, target_velocity,
+        ['drag_coefficient', 'drag_force_pylon', 'drag_force_mocowanie', 'drag_force_gondola'])
 
-    rear_pylon_drag = rear_parts_manager.get_interpolated_drag_force_pylon(rear_target_angle_of_attack, target_velocity)
-
-    rear_mocowanie_drag = rear_parts_manager.get_interpolated_drag_force_mocowanie(rear_target_angle_of_attack,
-                                                                                   target_velocity)
-    gondola_drag = rear_parts_manager.get_interpolated_drag_force_gondola(rear_target_angle_of_attack, target_velocity)
+    rear_foil_drag = (1 / 2) * WATER_DENSITY * pow(target_velocity, 2) * rear_foil_area * values['drag_coefficient']
+    rear_pylon_drag = values['drag_force_pylon']
+    rear_mocowanie_drag = values['drag_force_mocowanie']
+    gondola_drag = values['drag_force_gondola']
 
     return rear_foil_drag, rear_pylon_drag, rear_mocowanie_drag, gondola_drag
 
@@ -157,21 +132,43 @@ def overall_lift_analysis(target_velocity, frontFoilManager: FoilManager, front_
     :param front_target_angle_of_attack: Angle of attack of front foils for which the flight is calculated.
     :param rearFoilManager: Container of rear foils data.
     :param rear_target_angle_of_attack: Angle of attack of rear foils for which the flight is calculated.
-    :return: rear_foil_area, front_foil_area
+    :return: LiftAnalysisResult(rear_foil_area, front_foil_area)
     """
 
-    print('Target velocity is: ', target_velocity)
-    print('Front target angle of attack is: ', front_target_angle_of_attack)
-    print('Rear target angle of attack is: ', rear_target_angle_of_attack)
+    logger.info('Target velocity is: %s', target_velocity)
+    logger.info('Front target angle of attack is: %s', front_target_angle_of_attack)
+    logger.info('Rear target angle of attack is: %s', rear_target_angle_of_attack)
 
     # rear foil calculations
-    rear_foil_area = _calculate_foil_area(rear_target_angle_of_attack, target_velocity, boat.rear_pylon_mass,
-                                          rearFoilManager)
+    rear_foil = _calculate_foil_area(rear_target_angle_of_attack, target_velocity, boat.rear_pylon_mass,
+                                     rearFoilManager)
 
     # front foil calculations
-    front_foil_area = _calculate_foil_area(front_target_angle_of_attack, target_velocity, boat.front_pylon_left_mass,
-                                           frontFoilManager)
-    return rear_foil_area, front_foil_area
+    front_foil = _calculate_foil_area(front_target_angle_of_attack, target_velocity, boat.front_pylon_left_mass,
+                                      frontFoilManager)
+    return LiftAnalysisResult(rear_foil.foil_area, front_foil.foil_area)
+
+
+def design_foil_areas(boat: Boat, foilManager: FoilManager, front_mass_ratio=0.666666, target_velocity=8.0,
+                      front_target_angle_of_attack=0, rear_target_angle_of_attack=0):
+    """
+    Foil areas of the boat designed for given flight, by default the design of the Delta foils: 8 m/s at 0 deg (the
+    highest cl/cd) with 2/3 of the mass on the front pylons.
+
+    The center of mass of the boat is moved to give front_mass_ratio.
+
+    :param boat: Boat model.
+    :param foilManager: Container of the data of both front and rear foils.
+    :param front_mass_ratio: Part of the mass on both front pylons.
+    :param target_velocity: Velocity for which the foils are designed.
+    :param front_target_angle_of_attack: Angle of attack of front foils at the target velocity.
+    :param rear_target_angle_of_attack: Angle of attack of rear foils at the target velocity.
+    :return: LiftAnalysisResult(rear_foil_area, front_foil_area)
+    """
+    boat.center_of_mass_based_on_front_rear_mass_ratio(front_mass_ratio, boat.front_pylons_x_position,
+                                                       boat.front_pylons_y_width, boat.rear_pylon_x_position)
+    return overall_lift_analysis(target_velocity, foilManager, front_target_angle_of_attack, foilManager,
+                                 rear_target_angle_of_attack, boat)
 
 
 def general_analysis():
@@ -184,51 +181,71 @@ def general_analysis():
     boat = read_boat_data(boat_path, 0)
     sim_number = input("Choose front simulation: \n1. New boat pylon and mounting\n2. Celka old pylon and mounting\n")
     if (sim_number == '1'):
-        front_path = script_dir / '..' / '..' / 'data_overall_drag' / 'CFD_3D_opory_latania_nowy_pylon.csv'
-        front_path = front_path.resolve()
-        front_manager = FoilManager('FRONT_DRAG', 'New Front pylons', front_path,  NACA6409_AREA)
+        front_manager = default_registry()['New front drags']
     elif (sim_number == '2'):
-        front_path = script_dir / '..' / '..' / 'data_overall_drag' / 'CFD_3D_opory_latania_Celka_2024.csv'
-        front_path = front_path.resolve()
-        front_manager = FoilManager('FRONT_DRAG', 'Old Front pylons', front_path,  NACA6409_AREA)
+        front_manager = default_registry()['Celka front drags']
     else:
-        print("Wrong simulation number")
+        logger.error('Wrong simulation number')
 
 
-def Celka_front_drag_analysis(angle_of_attack, velocity):
-    script_dir = Path(__file__).resolve().parent
-    Front_Celka_drags_path = script_dir / '..' / '..' / 'data_overall_drag' / 'CFD_3D_opory_latania_Celka_2024.csv'
-    Front_Celka_drags_path = Front_Celka_drags_path.resolve()
+# The memoized analyses take the data_version of the dataset, so the results computed before a change of its data
+# (e.g. FoilManager.append_data) aren't reused
+@lru_cache(maxsize=MEMOIZE_SIZE)
+def _memoized_front_drag_analysis(dataset, data_version, front_foil_area, velocity, angle_of_attack):
+    drags = overall_front_drag_analysis(front_foil_area, velocity, default_registry()[dataset], angle_of_attack)
+    return tuple(float(drag) for drag in drags)
 
-    data_manager_Front_Celka_drags = FoilManager('FRONT_DRAG', 'Front pylons', Front_Celka_drags_path,
-                                                 NACA6409_AREA)
-    data_manager_Front_Celka_drags.load_data()
-    data_manager_Front_Celka_drags.clean_data()
-    data_manager_Front_Celka_drags.multiply_forces_by_2()
-    data_manager_Front_Celka_drags.calculate_lift_coefficient()
-    data_manager_Front_Celka_drags.calculate_drag_coefficient()
 
-    front_foil_drag, front_pylon_drag, front_mocowanie_drag = overall_front_drag_analysis(NACA6409_AREA, velocity,
-                                                                                          data_manager_Front_Celka_drags,
-                                                                                          angle_of_attack)
+@lru_cache(maxsize=MEMOIZE_SIZE)
+def _memoized_rear_drag_analysis(dataset, data_version, rear_foil_area, velocity, angle_of_attack):
+    drags = overall_rear_drag_analysis(rear_foil_area, velocity, default_registry()[dataset], angle_of_attack)
+    return tuple(float(drag) for drag in drags)
 
-    return front_foil_drag, front_pylon_drag, front_mocowanie_drag
 
+def analysis_cache_info():
+    """
+    Hit and miss statistics of the memoized analyses.
 
-def Celka_rear_drag_analysis(velocity):
-    script_dir = Path(__file__).resolve().parent
-    Rear_Celka_drags_path = script_dir / '..' / '..' / 'data_overall_drag' / 'CFD_3D_opory_latania_Celka_tyl_gondola.csv'
-    Rear_Celka_drags_path = Rear_Celka_drags_path.resolve()
+    :return: dictionary: name of the analysis -> (hits, misses, maxsize, currsize)
+    """
+    return {
+        'front_drag_analysis': _memoized_front_drag_analysis.cache_info(),
+        'rear_drag_analysis': _memoized_rear_drag_analysis.cache_info(),
+    }
 
-    data_manager_Rear_Celka_drags = FoilManager('REAR_DRAG', 'Front pylons', Rear_Celka_drags_path,
-                                                EPPLER908_AREA)
-    data_manager_Rear_Celka_drags.load_data()
-    data_manager_Rear_Celka_drags.clean_data()
-    data_manager_Rear_Celka_drags.multiply_forces_by_2()
-    data_manager_Rear_Celka_drags.calculate_lift_coefficient()
-    data_manager_Rear_Celka_drags.calculate_drag_coefficient()
 
-    return overall_rear_drag_analysis(EPPLER908_AREA, velocity, data_manager_Rear_Celka_drags)
+def clear_analysis_cache():
+    """
+    Forget the results of the memoized analyses, e.g. to free the memory. The results of changed data are not reused
+    anyway, see data_version of FoilManager.
+    """
+    _memoized_front_drag_analysis.cache_clear()
+    _memoized_rear_drag_analysis.cache_clear()
+
+
+def Celka_front_drag_analysis(angle_of_attack, velocity):
+    """
+    Drags of the front parts of Celka. The results are memoized with the arguments rounded to MEMOIZE_DECIMALS.
+
+    :return: front_foil_drag, front_pylon_drag, front_mocowanie_drag
+    """
+    registry = default_registry()
+    return _memoized_front_drag_analysis('Celka front drags', registry['Celka front drags'].data_version,
+                                         registry.specs['Celka front drags']['area'],
+                                         round(float(velocity), MEMOIZE_DECIMALS),
+                                         round(float(angle_of_attack), MEMOIZE_DECIMALS))
+
+
+def Celka_rear_drag_analysis(velocity):
+    """
+    Drags of the rear parts of Celka. The results are memoized with the velocity rounded to MEMOIZE_DECIMALS.
+
+    :return: rear_foil_drag, rear_pylon_drag, rear_mocowanie_drag, gondola_drag
+    """
+    registry = default_registry()
+    return _memoized_rear_drag_analysis('Celka rear drags', registry['Celka rear drags'].data_version,
+                                        registry.specs['Celka rear drags']['area'],
+                                        round(float(velocity), MEMOIZE_DECIMALS), 0.0)
 
 
 def Celka_overall_lift_analysis():
@@ -238,28 +255,10 @@ def Celka_overall_lift_analysis():
     Celka = read_boat_data(Celka_path)
 
     # FRONT ###############################
-    Front_Celka_drags_path = script_dir / '..' / '..' / 'data_overall_drag' / 'CFD_3D_opory_latania_Celka_2024.csv'
-    Front_Celka_drags_path = Front_Celka_drags_path.resolve()
-
-    data_manager_Front_Celka_drags = FoilManager('FRONT_DRAG', 'Front pylons', Front_Celka_drags_path,
-                                                 NACA6409_AREA)
-    data_manager_Front_Celka_drags.load_data()
-    data_manager_Front_Celka_drags.clean_data()
-    data_manager_Front_Celka_drags.multiply_forces_by_2()
-    data_manager_Front_Celka_drags.calculate_lift_coefficient()
-    data_manager_Front_Celka_drags.calculate_drag_coefficient()
+    data_manager_Front_Celka_drags = default_registry()['Celka front drags']
 
     # REAR ##################################
-    Rear_Celka_drags_path = script_dir / '..' / '..' / 'data_overall_drag' / 'CFD_3D_opory_latania_Celka_tyl_gondola.csv'
-    Rear_Celka_drags_path = Rear_Celka_drags_path.resolve()
-
-    data_manager_Rear_Celka_drags = FoilManager('REAR_DRAG', 'Front pylons', Rear_Celka_drags_path,
-                                                EPPLER908_AREA)
-    data_manager_Rear_Celka_drags.load_data()
-    data_manager_Rear_Celka_drags.clean_data()
-    data_manager_Rear_Celka_drags.multiply_forces_by_2()
-    data_manager_Rear_Celka_drags.calculate_lift_coefficient()
-    data_manager_Rear_Celka_drags.calculate_drag_coefficient()
+    data_manager_Rear_Celka_drags = default_registry()['Celka rear drags']
 
     target_velocity = 7.5
     front_target_aoa = 0.7
@@ -269,8 +268,8 @@ def Celka_overall_lift_analysis():
                                                             front_target_aoa,
                                                             data_manager_Rear_Celka_drags, rear_target_aoa, Celka)
 
-    print("Rear foil area = ", rear_foil_area)
-    print("Front foil area = ", front_foil_area)
+    logger.info('Rear foil area = %s', rear_foil_area)
+    logger.info('Front foil area = %s', front_foil_area)
 
 
 def Celka_overall_drag_analysis():
@@ -279,42 +278,20 @@ def Celka_overall_drag_analysis():
     front_foil_drag, front_pylon_drag, front_mocowanie_drag = Celka_front_drag_analysis(front_angle_of_attack, velocity)
 
     rear_foil_drag, rear_pylon_drag, rear_mocowanie_drag, gondola_drag = Celka_rear_drag_analysis(velocity)
-    print("################################################")
-    print("Velocity = ", velocity)
-    print("Front angle of attack = ", front_angle_of_attack, "\n")
+    logger.info('Velocity = %s', velocity)
+    logger.info('Front angle of attack = %s', front_angle_of_attack)
 
     front_part_drag = front_foil_drag + front_pylon_drag + front_mocowanie_drag
-    print("Single front part drag (foil + pylon + mocowanie) = ", front_part_drag)
+    logger.info('Single front part drag (foil + pylon + mocowanie) = %s', front_part_drag)
     rear_part_drag = rear_foil_drag + rear_pylon_drag + rear_mocowanie_drag + gondola_drag
-    print("Rear part drag (foil + pylon + mocowanie + GONDOLA) = ", rear_part_drag)
-    print("\n\n")
+    logger.info('Rear part drag (foil + pylon + mocowanie + GONDOLA) = %s', rear_part_drag)
     overall_celka_drag = 2 * front_part_drag + rear_part_drag
-    print("Overall Celka drag = ", overall_celka_drag)
+    logger.info('Overall Celka drag = %s', overall_celka_drag)
 
 
 def new_boat_front_drag_analysis():
-    script_dir = Path(__file__).resolve().parent
-    New_Boat_drags_path = script_dir / '..' / '..' / 'data_overall_drag' / 'CFD_3D_opory_latania_nowy_pylon.csv'
-    New_Boat_drags_path = New_Boat_drags_path.resolve()
-
-    data_manager_New_Boat_drags = FoilManager('FRONT_DRAG', 'New Front pylons', New_Boat_drags_path,
-                                              NACA6409_AREA)
-    data_manager_New_Boat_drags.load_data()
-    data_manager_New_Boat_drags.clean_data()
-    data_manager_New_Boat_drags.multiply_forces_by_2()
-    data_manager_New_Boat_drags.calculate_lift_coefficient()
-    data_manager_New_Boat_drags.calculate_drag_coefficient()
-
-    EPPLER908_CFD_path = script_dir / '..' / '..' / 'data_CFD' / 'CFD_3D_skrzydla_tylnie2021_eppler908_Wyniki_p.csv'
-    EPPLER908_CFD_path = EPPLER908_CFD_path.resolve()
-
-    data_manager_EPPLER908 = FoilManager('CFD', 'EPPLER 908', EPPLER908_CFD_path,  EPPLER908_AREA)
-    data_manager_EPPLER908.load_data()
-    data_manager_EPPLER908.clean_data()
-    data_manager_EPPLER908.multiply_forces_by_2()
-    data_manager_EPPLER908.calculate_lift_coefficient()
-    data_manager_EPPLER908.calculate_drag_coefficient()
-    data_manager_EPPLER908.calculate_cl_cd()
+    data_manager_New_Boat_drags = default_registry()['New front drags']
+    data_manager_EPPLER908 = default_registry()['EPPLER908']
 
     Celka = Boat(6.039, 1.69, 170)
     Celka.distribution_of_masses(2.676, 3.551, 0.725, 0.386)
@@ -326,15 +303,15 @@ def new_boat_front_drag_analysis():
     rear_foil_area, front_foil_area = overall_lift_analysis(target_velocity, data_manager_New_Boat_drags,
                                                             front_angle_of_attack, data_manager_EPPLER908, 0.0, Celka)
 
-    print("Front foil area from CFD data with NEW mountings and pylons")
-    print("Parameters:")
-    print("Boat mass: ", Celka.mass)
-    print("velocity: ", target_velocity)
-    print("target angle of attack: ", front_angle_of_attack)
-    print("front foil area is: ", front_foil_area)
-    print("rear foil area is: ", rear_foil_area)
-    print("CURRENT CELKA'S front foil area is: ", NACA6409_AREA)
-    print("CURRENT CELKA'S rear foil area is: ", EPPLER908_AREA)
+    logger.info('Front foil area from CFD data with NEW mountings and pylons')
+    logger.info('Parameters:')
+    logger.info('Boat mass: %s', Celka.mass)
+    logger.info('velocity: %s', target_velocity)
+    logger.info('target angle of attack: %s', front_angle_of_attack)
+    logger.info('front foil area is: %s', front_foil_area)
+    logger.info('rear foil area is: %s', rear_foil_area)
+    logger.info("CURRENT CELKA'S front foil area is: %s", default_registry().specs['Celka front drags']['area'])
+    logger.info("CURRENT CELKA'S rear foil area is: %s", default_registry().specs['Celka rear drags']['area'])
 
     front_foil_drag, front_pylon_drag, front_mocowanie_drag = overall_front_drag_analysis(front_foil_area,
                                                                                           target_velocity,
@@ -344,21 +321,19 @@ def new_boat_front_drag_analysis():
                                                               data_manager_New_Boat_drags, front_angle_of_attack,
                                                               data_manager_EPPLER908, 0)
 
-    print("Overall drag results:")
-    print("front foil drag = ", front_foil_drag)
-    print("front pylon drag = ", front_pylon_drag)
-    print("front mocowanie drag = ", front_mocowanie_drag)
-    print("\nSUM =                ", front_foil_drag + front_pylon_drag + front_mocowanie_drag)
+    logger.info('Overall drag results:')
+    logger.info('front foil drag = %s', front_foil_drag)
+    logger.info('front pylon drag = %s', front_pylon_drag)
+    logger.info('front mocowanie drag = %s', front_mocowanie_drag)
+    logger.info('SUM = %s', front_foil_drag + front_pylon_drag + front_mocowanie_drag)
 
-    print("\n\n\n")
-    print("rear foil drag = ", rear_foil_drag)
-    print("\n\n\n")
-    print("Whole boat drag results:")
+    logger.info('rear foil drag = %s', rear_foil_drag)
+    logger.info('Whole boat drag results:')
     whole_boat_drag = 2 * (front_foil_drag + front_pylon_drag + front_mocowanie_drag) + rear_foil_drag
-    print("whole boat drag = ", whole_boat_drag)
-    print("\n")
-    print("!!!!! IT DOESN'T CONSIDER DRAG GENERATED BY GONDOLA !!!!!!")
+    logger.info('whole boat drag = %s', whole_boat_drag)
+    logger.info("!!!!! IT DOESN'T CONSIDER DRAG GENERATED BY GONDOLA !!!!!!")
 
+    from src.foils_data.FoilPlotter import FoilPlotter
     return FoilPlotter(data_manager_New_Boat_drags), data_manager_New_Boat_drags
 
 
@@ -386,18 +361,7 @@ def not_centered_mass_analysis():
                                                         rear_pylon_y_position)
 
     # Foil data preparation
-    script_dir = Path(__file__).resolve().parent
-    New_Boat_drags_path = script_dir / '..' / '..' / 'data_overall_drag' / 'CFD_3D_opory_latania_nowy_pylon.csv'
-    New_Boat_drags_path = New_Boat_drags_path.resolve()
-
-    data_manager_New_Boat_drags = FoilManager('FRONT_DRAG', 'New Front pylons', New_Boat_drags_path,
-                                              NACA6409_AREA)
-    data_manager_New_Boat_drags.load_data()
-    data_manager_New_Boat_drags.clean_data()
-    data_manager_New_Boat_drags.multiply_forces_by_2()
-    data_manager_New_Boat_drags.calculate_lift_coefficient()
-    data_manager_New_Boat_drags.calculate_drag_coefficient()
-    data_manager_New_Boat_drags.calculate_cl_cd()
+    data_manager_New_Boat_drags = default_registry()['New front drags']
 
     ################################
     # ASSUMPTIONS
@@ -412,10 +376,10 @@ def not_centered_mass_analysis():
                                                             front_target_aoa,
                                                             data_manager_New_Boat_drags, rear_target_aoa, Delta)
 
-    print("Rear foil area is: ", rear_foil_area)
-    print("Front foil area is: ", front_foil_area)
+    logger.info('Rear foil area is: %s', rear_foil_area)
+    logger.info('Front foil area is: %s', front_foil_area)
 
-    print("\n\n CONSIDERING UNEQUAL DISTRIBUTION\n\n")
+    logger.info('CONSIDERING UNEQUAL DISTRIBUTION')
 
     # Case 1. The areas are calculated for equal mass distribution. Let's consider unequal mass distribution,
     # and correct the produced lift force with different aoa
@@ -430,13 +394,13 @@ def not_centered_mass_analysis():
     unequal_rear_aoa = _calculate_aoa_based_on_area(rear_foil_area, target_velocity, Delta.rear_pylon_mass,
                                                     data_manager_New_Boat_drags)
 
-    print("AoA for front pylon is: ", unequal_front_aoa)
-    print("Aoa for rear pylon is: ", unequal_rear_aoa)
+    logger.info('AoA for front pylon is: %s', unequal_front_aoa)
+    logger.info('Aoa for rear pylon is: %s', unequal_rear_aoa)
 
     # Calculation of drag forces
     # EQUAL distribution:
 
-    print("\n CALCULATION OF DRAG FORCES \n")
+    logger.info('CALCULATION OF DRAG FORCES')
     equal_front_foil_drag, equal_front_pylon_drag, equal_front_mocowanie_drag = overall_front_drag_analysis(
         front_foil_area, target_velocity, data_manager_New_Boat_drags, front_target_aoa)
 
@@ -450,31 +414,33 @@ def not_centered_mass_analysis():
 
     equal_sum = (equal_front_foil_drag + equal_front_pylon_drag + equal_front_mocowanie_drag) * 3
     # Equal distribution:
-    print("Equal Distribution Front Drags:")
-    print(f"  Foil Drag: {equal_front_foil_drag}")
-    print(f"  Pylon Drag: {equal_front_pylon_drag}")
-    print(f"  Mocowanie Drag: {equal_front_mocowanie_drag}\n")
-    print(f"  Sum of all drag forces: {equal_sum}\n\n")
+    logger.info('Equal Distribution Front Drags:')
+    logger.info('  Foil Drag: %s', equal_front_foil_drag)
+    logger.info('  Pylon Drag: %s', equal_front_pylon_drag)
+    logger.info('  Mocowanie Drag: %s', equal_front_mocowanie_drag)
+    logger.info('  Sum of all drag forces: %s', equal_sum)
 
     unequal_sum = (unequal_front_foil_drag + unequal_front_pylon_drag + unequal_front_mocowanie_drag) * 2 + unequal_rear_foil_drag + unequal_rear_pylon_drag + unequal_rear_mocowanie_drag
     # Unequal distribution (Front):
-    print("Unequal Distribution Front Drags:")
-    print(f"  Foil Drag: {unequal_front_foil_drag}")
-    print(f"  Pylon Drag: {unequal_front_pylon_drag}")
-    print(f"  Mocowanie Drag: {unequal_front_mocowanie_drag}\n")
+    logger.info('Unequal Distribution Front Drags:')
+    logger.info('  Foil Drag: %s', unequal_front_foil_drag)
+    logger.info('  Pylon Drag: %s', unequal_front_pylon_drag)
+    logger.info('  Mocowanie Drag: %s', unequal_front_mocowanie_drag)
 
     # Unequal distribution (Rear):
-    print("Unequal Distribution Rear Drags:")
-    print(f"  Foil Drag: {unequal_rear_foil_drag}")
-    print(f"  Pylon Drag: {unequal_rear_pylon_drag}")
-    print(f"  Mocowanie Drag: {unequal_rear_mocowanie_drag}")
-    print(f"  Sum of all drag forces: {unequal_sum}\n\n")
+    logger.info('Unequal Distribution Rear Drags:')
+    logger.info('  Foil Drag: %s', unequal_rear_foil_drag)
+    logger.info('  Pylon Drag: %s', unequal_rear_pylon_drag)
+    logger.info('  Mocowanie Drag: %s', unequal_rear_mocowanie_drag)
+    logger.info('  Sum of all drag forces: %s', unequal_sum)
 
-    print(f"  Difference in sum drag forces: {unequal_sum-equal_sum}\n\n")
-    print(f"  Percentage increase relative to an equal distribution: {((unequal_sum-equal_sum)/unequal_sum)*100}%")
+    logger.info('  Difference in sum drag forces: %s', unequal_sum-equal_sum)
+    logger.info('  Percentage increase relative to an equal distribution: %s%%',
+                ((unequal_sum-equal_sum)/unequal_sum)*100)
 
     # PLOTTING MODULE
 
+    from src.foils_data.FoilPlotter import FoilPlotter
     Foil_Plotter_New_Boat = FoilPlotter(data_manager_New_Boat_drags)
     Foil_Plotter_New_Boat.plot_cl_cd_at_target_velocity_compare_foils(8)
     Foil_Plotter_New_Boat.plot_drag_force_target_velocity_compare_foils(8)
@@ -490,68 +456,46 @@ def not_centered_mass_analysis_V2():
     ############################
 
     Delta = Boat(6, 1.6, mass, front_pylon_x_position, front_pylon_y_width, rear_pylon_x_position)
-    Delta.center_of_mass_based_on_front_rear_mass_ratio(equal_mass_ratio, front_pylon_x_position, front_pylon_y_width,
-                                                        rear_pylon_x_position)
 
     # Foil data preparation
-    script_dir = Path(__file__).resolve().parent
-    New_Boat_drags_path = script_dir / '..' / '..' / 'data_overall_drag' / 'CFD_3D_opory_latania_nowy_pylon.csv'
-    New_Boat_drags_path = New_Boat_drags_path.resolve()
-
-    data_manager_New_Boat_drags = FoilManager('FRONT_DRAG', 'New Front pylons', New_Boat_drags_path,
-                                              NACA6409_AREA)
-    data_manager_New_Boat_drags.load_data()
-    data_manager_New_Boat_drags.clean_data()
-    data_manager_New_Boat_drags.multiply_forces_by_2()
-    data_manager_New_Boat_drags.calculate_lift_coefficient()
-    data_manager_New_Boat_drags.calculate_drag_coefficient()
-    data_manager_New_Boat_drags.calculate_cl_cd()
+    data_manager_New_Boat_drags = default_registry()['New front drags']
 
     ################################
     # ASSUMPTIONS
     # target_velocity is the velocity for which the boat is designed. At that velocity the boat should have optimal aoa
     # on foils - at the highest cl/cd value. That is at 0 deg for NACA6409
     target_velocity = 8.0
-    front_target_aoa = 0
-    rear_target_aoa = 0
 
     # The areas are calculated for given velocity, aoa, and profile
-    rear_foil_area, front_foil_area = overall_lift_analysis(target_velocity, data_manager_New_Boat_drags,
-                                                            front_target_aoa,
-                                                            data_manager_New_Boat_drags, rear_target_aoa, Delta)
-
-    print("Rear foil area is: ", rear_foil_area)
-    print("Front foil area is: ", front_foil_area)
+    rear_foil_area, front_foil_area = design_foil_areas(Delta, data_manager_New_Boat_drags, equal_mass_ratio,
+                                                        target_velocity)
 
-    # Arrays to store mass ratios and corresponding drag forces
-    mass_ratios = np.linspace(0.5, 0.8, 36)  # Mass ratios from 0.5 to 0.8
-    drag_forces = []
+    logger.info('Rear foil area is: %s', rear_foil_area)
+    logger.info('Front foil area is: %s', front_foil_area)
 
-    for unequal_mass_ratio in mass_ratios:
-        # Update the center of mass based on the new mass ratio
-        Delta.center_of_mass_based_on_front_rear_mass_ratio(unequal_mass_ratio, front_pylon_x_position,
-                                                            front_pylon_y_width, rear_pylon_x_position)
-        # Calculate AoA for front and rear foils based on the new mass distribution
-        unequal_front_aoa = _calculate_aoa_based_on_area(front_foil_area, target_velocity,
-                                                         Delta.front_pylon_left_mass, data_manager_New_Boat_drags)
-        unequal_rear_aoa = _calculate_aoa_based_on_area(rear_foil_area, target_velocity, Delta.rear_pylon_mass,
-                                                        data_manager_New_Boat_drags)
+    # Mass ratios from 0.5 to 0.8, all the configurations are calculated at once
+    mass_ratios = np.linspace(0.5, 0.8, 36)
+    sweep = Delta.mass_ratio_sweep(mass_ratios)
 
-        # Calculation of drag forces for front and rear foils
-        unequal_front_foil_drag, unequal_front_pylon_drag, unequal_front_mocowanie_drag = overall_front_drag_analysis(
-            front_foil_area, target_velocity, data_manager_New_Boat_drags, unequal_front_aoa)
+    # Calculate AoA for front and rear foils based on the new mass distribution
+    unequal_front_aoa = _calculate_aoa_based_on_area(front_foil_area, target_velocity, sweep['front_pylon_mass'],
+                                                     data_manager_New_Boat_drags)
+    unequal_rear_aoa = _calculate_aoa_based_on_area(rear_foil_area, target_velocity, sweep['rear_pylon_mass'],
+                                                    data_manager_New_Boat_drags)
 
-        unequal_rear_foil_drag, unequal_rear_pylon_drag, unequal_rear_mocowanie_drag = overall_front_drag_analysis(
-            rear_foil_area, target_velocity, data_manager_New_Boat_drags, unequal_rear_aoa)
+    # Calculation of drag forces for front and rear foils
+    unequal_front_foil_drag, unequal_front_pylon_drag, unequal_front_mocowanie_drag = overall_front_drag_analysis(
+        front_foil_area, target_velocity, data_manager_New_Boat_drags, unequal_front_aoa)
 
-        # Sum of all drag forces
-        unequal_sum = (unequal_front_foil_drag + unequal_front_pylon_drag + unequal_front_mocowanie_drag) * 2 + \
-                      unequal_rear_foil_drag + unequal_rear_pylon_drag + unequal_rear_mocowanie_drag
+    unequal_rear_foil_drag, unequal_rear_pylon_drag, unequal_rear_mocowanie_drag = overall_front_drag_analysis(
+        rear_foil_area, target_velocity, data_manager_New_Boat_drags, unequal_rear_aoa)
 
-        # Append the results to arrays
-        drag_forces.append(unequal_sum)
+    # Sum of all drag forces
+    drag_forces = (unequal_front_foil_drag + unequal_front_pylon_drag + unequal_front_mocowanie_drag) * 2 + \
+        unequal_rear_foil_drag + unequal_rear_pylon_drag + unequal_rear_mocowanie_drag
 
     # Plotting the results
+    from matplotlib import pyplot as plt
     plt.figure(figsize=(10, 6))
     plt.plot(mass_ratios, drag_forces, marker='o', linestyle='-', color='b')
     plt.title('Total Drag Force vs Mass Ratio')
@@ -559,10 +503,33 @@ def not_centered_mass_analysis_V2():
     plt.ylabel('Total Drag Force (N)')
     plt.grid(True)
     plt.show()
-#####################################
-#               KODZIK
-#####################################
 
-not_centered_mass_analysis()
-#not_centered_mass_analysis_V2()
-#Celka_overall_lift_analysis()
\ No newline at end of file
+
+# Analyses which can be run from the command line
+ANALYSES = {
+    'general_analysis': general_analysis,
+    'Celka_overall_lift_analysis': Celka_overall_lift_analysis,
+    'Celka_overall_drag_analysis': Celka_overall_drag_analysis,
+    'new_boat_front_drag_analysis': new_boat_front_drag_analysis,
+    'not_centered_mass_analysis': not_centered_mass_analysis,
+    'not_centered_mass_analysis_V2': not_centered_mass_analysis_V2,
+}
+
+
+def main():
+    """
+    Command line entry point: python -m src.boat_analysis.OverallAnalysis [analysis]
+    """
+    parser = argparse.ArgumentParser(description='Modelling of the flight of the boat.')
+    parser.add_argument('analysis', nargs='?', default='not_centered_mass_analysis', choices=list(ANALYSES),
+                        help='analysis to run (default: %(default)s)')
+    parser.add_argument('-q', '--quiet', action='store_true', help="don't show the intermediate results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, format='%(message)s')
+
+    ANALYSES[args.analysis]()
+
+
+if __name__ == '__main__':
+    main()
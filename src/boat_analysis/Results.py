@@ -0,0 +1,49 @@
+from typing import NamedTuple
+
+import numpy as np
+
+# Result records of the flight model. They are named tuples, so they are as light as tuples, the results with few
+# fields can still be unpacked like before, and many records can be collected into a single numpy array.
+
+
+class MassDistribution(NamedTuple):
+    """
+    Masses carried by the pylons of a Boat and the position of its center of mass.
+    """
+    rear_pylon_mass: float
+    front_pylon_right_mass: float
+    front_pylon_left_mass: float
+    mass_center_x_position: float
+
+
+class FoilAreaResult(NamedTuple):
+    """
+    Area of a foil which carries the mass on its pylon.
+    """
+    foil_name: str
+    target_velocity: float
+    angle_of_attack: float
+    pylon_mass: float
+    lift_coefficient: float
+    foil_area: float
+
+
+class LiftAnalysisResult(NamedTuple):
+    """
+    Areas of the foils of the whole boat, unpacked as rear_foil_area, front_foil_area.
+    """
+    rear_foil_area: float
+    front_foil_area: float
+
+
+def to_record_array(records):
+    """
+    Collect result records of the same type into a numpy record array, e.g. to write the results of a sweep at once.
+
+    :param records: sequence of result records (named tuples) of the same type.
+    :return: np.recarray with one field per field of the records.
+    """
+    records = list(records)
+    if not records:
+        raise ValueError("No records to collect.")
+    return np.rec.fromrecords(records, names=list(type(records[0])._fields))
@@ -0,0 +1,144 @@
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.boat_analysis.Boat import Boat
+from src.boat_analysis.OperatingEnvelope import flight_state
+from src.boat_analysis.OverallAnalysis import design_foil_areas
+from src.foils_data.FoilManager import FoilManager
+from src.foils_data.FoilRegistry import default_registry
+
+# Module to replay a velocity vs time log of a run through the flight model and integrate the used energy
+
+# Results of the analyses are logged on INFO level
+logger = logging.getLogger(__name__)
+
+# Resolution of the flight conditions, samples which round to the same velocity and mass share the flight state
+VELOCITY_STEP = 0.01
+MASS_STEP = 0.1
+
+
+def read_speed_profile(csv_path):
+    """
+    Read a speed profile from a csv file with columns: time [s], velocity [m/s] and optionally mass [kg].
+
+    :param csv_path: path to the csv file.
+    :return: time, velocity, mass (None if the file has no mass column) arrays
+    """
+    df = pd.read_csv(csv_path)
+    mass = df['mass'].to_numpy(dtype='float64') if 'mass' in df.columns else None
+    return df['time'].to_numpy(dtype='float64'), df['velocity'].to_numpy(dtype='float64'), mass
+
+
+def simulate_speed_profile(time, velocities, boat: Boat, front_mass_ratio, front_foil_area, rear_foil_area,
+                           front_parts_manager: FoilManager, rear_parts_manager: FoilManager, efficiency=1.0,
+                           masses=None, velocity_step=VELOCITY_STEP, mass_step=MASS_STEP, fallback_power=None):
+    """
+    Replay a speed profile through the flight model and integrate the energy used by the drive.
+
+    The velocities (and masses) are quantized to velocity_step (and mass_step), the flight state (see flight_state)
+    is evaluated once for every distinct quantized condition and the power is integrated over time with the trapezoidal
+    rule. The samples in which the boat can't fly on the foils (the required lift coefficient is outside of the data,
+    e.g. before take-off) are marked in the feasible mask. The flight model has no power for them, so they use
+    fallback_power if it is given (e.g. the power of sailing on the hull). Otherwise the intervals with such samples
+    aren't integrated: energy is the partial energy of the flight on foils and total_energy is NaN, unless all the
+    samples are feasible.
+
+    :param time: times of the samples [s], increasing.
+    :param velocities: velocities of the samples [m/s]
+    :param boat: Boat model, its mass and positions of pylons are used.
+    :param front_mass_ratio: ratio (0 - 1) of the mass carried by front pylons.
+    :param front_foil_area: area of a single front foil [m^2]
+    :param rear_foil_area: area of the rear foil [m^2]
+    :param front_parts_manager: container of front foils, pylons and mountings data.
+    :param rear_parts_manager: container of rear foil, pylon and mounting data.
+    :param efficiency: efficiency of the drive, passed to power_consumption.
+    :param masses: masses of the boat in the samples [kg], by default the mass of the boat.
+    :param velocity_step: resolution of the velocity [m/s]
+    :param mass_step: resolution of the mass [kg]
+    :param fallback_power: power [W] of the samples in which the boat can't fly on the foils, a scalar or an array of
+        the samples, by default unknown.
+    :return: dictionary with arrays of the samples: time, velocity, front_aoa, rear_aoa, total_drag, power, feasible,
+        energy (used energy up to the sample [J]), and total_energy [J] of the whole profile (NaN if it is partial),
+        foil_energy [J] used in the intervals flown on the foils and feasible_fraction of the samples.
+    """
+    time = np.asarray(time, dtype='float64')
+    velocities = np.asarray(velocities, dtype='float64')
+    masses = np.broadcast_to(np.asarray(boat.mass if masses is None else masses, dtype='float64'), velocities.shape)
+
+    # Distinct quantized flight conditions, the model is evaluated only for them
+    keys = np.column_stack([np.round(velocities / velocity_step), np.round(masses / mass_step)])
+    unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    unique_velocities = unique_keys[:, 0] * velocity_step
+
+    pylon_masses = boat.mass_ratio_sweep(front_mass_ratio, masses=unique_keys[:, 1] * mass_step)
+    state = flight_state(unique_velocities, pylon_masses['front_pylon_mass'], pylon_masses['rear_pylon_mass'],
+                         front_foil_area, rear_foil_area, front_parts_manager, rear_parts_manager, efficiency)
+
+    feasible = state['feasible'][inverse]
+    power = state['power'][inverse]
+    if fallback_power is not None:
+        power = np.where(feasible, power, np.broadcast_to(np.asarray(fallback_power, dtype='float64'), power.shape))
+
+    # Energy of every interval between the samples, the intervals with unknown power are skipped
+    interval_energy = np.diff(time) * (power[1:] + power[:-1]) / 2
+    known = ~np.isnan(interval_energy)
+    energy = np.concatenate([[0.0], np.cumsum(np.where(known, interval_energy, 0.0))])
+    flown = feasible[1:] & feasible[:-1]
+
+    return {
+        'time': time,
+        'velocity': velocities,
+        'front_aoa': state['front_aoa'][inverse],
+        'rear_aoa': state['rear_aoa'][inverse],
+        'total_drag': state['total_drag'][inverse],
+        'power': power,
+        'feasible': feasible,
+        'energy': energy,
+        'total_energy': float(energy[-1]) if known.all() else np.nan,
+        'foil_energy': float(np.sum(interval_energy[flown])),
+        'feasible_fraction': float(feasible.mean()) if len(feasible) else np.nan,
+    }
+
+
+def speed_profile_analysis(csv_path=None):
+    """
+    Energy used by the Delta boat on a speed profile, by default a synthetic 1 h run sampled at 100 Hz.
+    """
+    # Delta Parameters:
+    mass = 170
+    front_pylon_x_position = 4.3
+    front_pylon_y_width = 0.72
+    rear_pylon_x_position = 0.7
+    equal_mass_ratio = 0.666666
+    ############################
+
+    Delta = Boat(6, 1.6, mass, front_pylon_x_position, front_pylon_y_width, rear_pylon_x_position)
+    data_manager_New_Boat_drags = default_registry()['New front drags']
+
+    if csv_path is not None:
+        time, velocities, masses = read_speed_profile(Path(csv_path))
+    else:
+        time = np.arange(0, 3600, 0.01)
+        velocities = 8 + 1.5 * np.sin(2 * np.pi * time / 300)
+        masses = None
+
+    # Foil areas designed for 8 m/s at 0 deg with 2/3 of the mass on front pylons
+    rear_foil_area, front_foil_area = design_foil_areas(Delta, data_manager_New_Boat_drags, equal_mass_ratio)
+
+    results = simulate_speed_profile(time, velocities, Delta, equal_mass_ratio, front_foil_area, rear_foil_area,
+                                     data_manager_New_Boat_drags, data_manager_New_Boat_drags, masses=masses)
+
+    logger.info('Number of samples: %s', len(time))
+    logger.info('Flight on foils: %s %% of samples', results['feasible_fraction'] * 100)
+    logger.info('Energy used on foils: %s Wh', results['foil_energy'] / 3600)
+    # NaN if the boat doesn't fly on the foils in all the samples
+    logger.info('Used energy: %s Wh', results['total_energy'] / 3600)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    speed_profile_analysis()
@@ -0,0 +1,121 @@
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from src.boat_analysis.Boat import Boat, read_boat_data
+from src.foils_data.FoilManager import FoilManager
+from src.foils_data.FoilRegistry import default_registry
+from src.utilities.Constants import *
+
+# Module to find the minimal velocity at which the foils can lift the boat
+
+# Results of the analyses are logged on INFO level
+logger = logging.getLogger(__name__)
+
+
+def minimum_take_off_speed(foilManager: FoilManager, foil_area, pylon_mass):
+    """
+    Find the lowest velocity at which the foil can carry the mass on its pylon at some angle of attack within the data.
+
+    The foil lifts the mass when 1/2 * density * v^2 * area * cl >= m * g, so the lowest velocity is the first one
+    where v^2 * cl_max(v) reaches 2 * m * g / (density * area). The envelope cl_max(v) is taken from the angle of attack
+    solver of the foil, which tabulates it once. The velocity is interpolated between the tabulated ones.
+
+    :param foilManager: container of the foil data.
+    :param foil_area: area(s) of the foil [m^2]
+    :param pylon_mass: mass(es) on the pylon [kg], broadcast against the areas.
+    :return: minimal velocity(ies) [m/s], NaN where the foil can't carry the mass within the data. If the foil carries
+        the mass already at the lowest velocity of the data, that velocity is returned.
+    """
+    velocities, max_lift_coefficients = foilManager.get_angle_of_attack_solver().lift_coefficient_envelope()
+
+    # The highest capacity reached up to a velocity is non-decreasing, so the first velocity where it reaches the
+    # required value can be found with a binary search
+    capacity = np.fmax.accumulate(np.where(np.isnan(max_lift_coefficients), -np.inf,
+                                           velocities ** 2 * max_lift_coefficients))
+    required = (2 * np.asarray(pylon_mass, dtype='float64') * GRAVITATIONAL_ACCELERATION) / (
+            WATER_DENSITY * np.asarray(foil_area, dtype='float64'))
+
+    idx = np.searchsorted(capacity, required)
+    reachable = idx < len(velocities)
+    idx = np.clip(idx, 1, len(velocities) - 1)
+
+    capacity_left = capacity[idx - 1]
+    capacity_right = capacity[idx]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.clip((required - capacity_left) / (capacity_right - capacity_left), 0.0, 1.0)
+    fraction = np.where(np.isfinite(capacity_left), fraction, 1.0)
+    speed = velocities[idx - 1] + fraction * (velocities[idx] - velocities[idx - 1])
+
+    speed = np.where(required <= capacity[0], velocities[0], speed)
+    return np.where(reachable, speed, np.nan)[()]
+
+
+def take_off_speed_table(foil_managers, boats, front_mass_ratios, front_foil_areas, rear_foil_areas):
+    """
+    Minimal take-off velocities of every combination of foil, boat and mass distribution.
+
+    The same foil is used on the front and rear pylons. The boat takes off when both front and rear foils carry their
+    masses.
+
+    :param foil_managers: list of containers of the foils data.
+    :param boats: list of Boat models.
+    :param front_mass_ratios: 1D array of ratios (0 - 1) of the mass carried by front pylons.
+    :param front_foil_areas: area(s) of a single front foil [m^2], broadcast against (foils, boats, mass ratios).
+    :param rear_foil_areas: area(s) of the rear foil [m^2], broadcast against (foils, boats, mass ratios).
+    :return: dictionary of arrays of shape (foils, boats, mass ratios): front_take_off_speed, rear_take_off_speed and
+        take_off_speed
+    """
+    front_mass_ratios = np.asarray(front_mass_ratios, dtype='float64')
+    shape = (len(foil_managers), len(boats), len(front_mass_ratios))
+
+    # Masses on the pylons of all boats and mass distributions, shape (boats, mass ratios)
+    sweeps = [boat.mass_ratio_sweep(front_mass_ratios) for boat in boats]
+    front_pylon_masses = np.stack([sweep['front_pylon_mass'] for sweep in sweeps])
+    rear_pylon_masses = np.stack([sweep['rear_pylon_mass'] for sweep in sweeps])
+    front_foil_areas = np.broadcast_to(front_foil_areas, shape)
+    rear_foil_areas = np.broadcast_to(rear_foil_areas, shape)
+
+    table = {
+        'front_take_off_speed': np.empty(shape),
+        'rear_take_off_speed': np.empty(shape),
+    }
+    for idx, foilManager in enumerate(foil_managers):
+        table['front_take_off_speed'][idx] = minimum_take_off_speed(foilManager, front_foil_areas[idx],
+                                                                    front_pylon_masses)
+        table['rear_take_off_speed'][idx] = minimum_take_off_speed(foilManager, rear_foil_areas[idx],
+                                                                   rear_pylon_masses)
+
+    # NaN of any of the foils means the boat can't take off
+    table['take_off_speed'] = np.maximum(table['front_take_off_speed'], table['rear_take_off_speed'])
+    return table
+
+
+def take_off_analysis():
+    """
+    Minimal take-off velocities of Celka and Delta boats with the foils of the catalog.
+    """
+    Celka_path = Path(__file__).resolve().parent / '..' / '..' / 'boat_parameters' / 'boat_parameters.csv'
+    Celka = read_boat_data(Celka_path.resolve())
+    Delta = Boat(6, 1.6, 170, 4.3, 0.72, 0.7)
+
+    foil_names = ['New front drags', 'Celka front drags', 'NACA 6409', 'NACA 64A715']
+    foil_managers = list(default_registry().load(foil_names).values())
+    mass_ratios = np.linspace(0.5, 0.8, 7)
+
+    # Foil areas of Celka
+    front_foil_area = default_registry().specs['Celka front drags']['area']
+    rear_foil_area = default_registry().specs['Celka rear drags']['area']
+    table = take_off_speed_table(foil_managers, [Celka, Delta], mass_ratios, front_foil_area, rear_foil_area)
+
+    logger.info('Minimal take-off velocity [m/s] for front mass ratios: %s', np.round(mass_ratios, 2))
+    for foil_idx, foil_name in enumerate(foil_names):
+        for boat_idx, boat_name in enumerate(['Celka', 'Delta']):
+            logger.info('%-20s %-6s %s', foil_name, boat_name,
+                        np.round(table['take_off_speed'][foil_idx, boat_idx], 2))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    take_off_analysis()
@@ -1,22 +1,242 @@
+import numpy as np
+import pandas as pd
+
+from src.foils_data.AngleOfAttackSolver import AngleOfAttackSolver
+from src.utilities.Constants import WATER_KINEMATIC_VISCOSITY
+from src.utilities.Profiling import profiled
+
+# Velocities over which the polars are tabulated when a velocity axis is needed and none is given, e.g. by
+# filter_data_by_angle or the 3D plots
+POLAR_VELOCITIES = [0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 5.5, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0]
+
+# Columns of the polars which aren't interpolated
+_POLAR_AXES = ['angle_of_attack', 'reynolds_number']
+
+
+def _reynolds_bracket(reynolds_axis, reynolds):
+    """
+    Find the polars around given Reynolds numbers in the sorted Reynolds number index.
+
+    Reynolds numbers outside of the index are clamped to its ends, so the first or last polar is used for them.
+
+    Returns:
+        (np.ndarray, np.ndarray): index of the lower polar and the weight (0 - 1) of the upper polar.
+    """
+    reynolds = np.clip(reynolds, reynolds_axis[0], reynolds_axis[-1])
+    upper = np.clip(np.searchsorted(reynolds_axis, reynolds), 1, len(reynolds_axis) - 1)
+    lower = upper - 1
+    weight = (reynolds - reynolds_axis[lower]) / (reynolds_axis[upper] - reynolds_axis[lower])
+    return lower, weight
+
+
+class _PolarInterpolator:
+    """
+    Interpolator of AFT polars with the same call signature as Rbf: interpolator(angle_of_attack, velocity).
+
+    The coefficient of every polar is interpolated over the angle of attack, and linearly between the two polars around
+    the Reynolds number of the velocity (reynolds_factor * velocity). A force is the coefficient scaled by
+    force_factor * velocity^2.
+    """
+    def __init__(self, reynolds_axis, polar_angles, polar_values, reynolds_factor=None, force_factor=None):
+        """
+        Parameters:
+            reynolds_axis (np.ndarray): sorted Reynolds numbers of the polars.
+            polar_angles (list): sorted angles of attack of every polar.
+            polar_values (list): values of the interpolated column of every polar.
+            reynolds_factor (float): Reynolds number per velocity, needed only for more than one polar.
+            force_factor (float): factor of velocity^2 of the force, None for a coefficient.
+        """
+        from scipy.interpolate import make_interp_spline
+
+        self.reynolds_axis = reynolds_axis
+        self.splines = [make_interp_spline(aoa, values, k=min(3, len(aoa) - 1))
+                        for aoa, values in zip(polar_angles, polar_values)]
+        self.reynolds_factor = reynolds_factor
+        self.force_factor = force_factor
+
+    def __call__(self, angle_of_attack, velocity):
+        aoa, vel = np.broadcast_arrays(np.asarray(angle_of_attack, dtype='float64'),
+                                       np.asarray(velocity, dtype='float64'))
+
+        if len(self.splines) == 1:
+            values = self.splines[0](aoa)
+        else:
+            lower, weight = _reynolds_bracket(self.reynolds_axis, self.reynolds_factor * vel)
+            values = np.empty(aoa.shape)
+            # Points between the same pair of polars are evaluated at once
+            for idx in np.unique(lower):
+                mask = lower == idx
+                values[mask] = (1 - weight[mask]) * self.splines[idx](aoa[mask]) + \
+                    weight[mask] * self.splines[idx + 1](aoa[mask])
+
+        if self.force_factor is not None:
+            values = values * self.force_factor * vel ** 2
+        return values
+
+
 class AFT_DataProcessingMixin:
+    """
+    Mixin for the polars of AFT (XFoil) results.
+
+    The polars are stored once, without the inlet_vel column, and the forces are calculated only for the requested
+    velocities. A dataset can have polars at many Reynolds numbers, then the polar of a velocity is interpolated
+    between the polars around its Reynolds number (velocity * chord length / kinematic viscosity).
+    """
+    @property
+    def is_polar(self):
+        """
+        Whether the data are AFT polars, which have no inlet_vel column.
+        """
+        return self.data is not None and 'inlet_vel' not in self.data.columns
+
+    @property
+    def velocity_independent(self):
+        """
+        Whether the data is a single polar, which is the same at any velocity.
+        """
+        return self.is_polar and len(self._get_interpolator(None, 'reynolds')[0]) == 1
+
+    def reynolds_numbers(self, velocities):
+        """
+        Reynolds numbers of the foil at given velocities.
+
+        **REQUIRES PROPER CHORD LENGTH INITIALIZATION**
+
+        Formula:
+
+        Re = velocity * chord_length / kinematic_viscosity
+        """
+        if self.m_chord_length == 0.0:
+            raise ValueError("Chord lentgh isn't properly initializated - can't calculate Reynolds number.")
+        return np.asarray(velocities, dtype='float64') * self.m_chord_length / WATER_KINEMATIC_VISCOSITY
+
+    @profiled(record_data=True)
     def calculate_lift(self, density):
         """
         Function to calculate the lift in an analytic way.
 
+        The lift isn't stored in the polars, it is calculated with given density whenever the polars are broadcast
+        over velocities (see polar_at_velocities) or interpolated.
+
         Formula:
 
         Lift = (1/2) * density * (velocity ^ 2) * Area * Lift_Coefficient
         """
+        self._polar_forces['lift_force'] = ('lift_coefficient', density)
+        self.invalidate_interpolators('lift_force')
 
-        self.data['lift_force'] = (1 / 2) * density * pow(self.data['inlet_vel'], 2) * self.m2_foil_area * self.data['lift_coefficient']
-
+    @profiled(record_data=True)
     def calculate_drag(self, density):
         """
         Function to calculate the drag in an analytic way.
 
+        The drag isn't stored in the polars, it is calculated with given density whenever the polars are broadcast
+        over velocities (see polar_at_velocities) or interpolated.
+
         Formula:
 
         Drag = (1/2) * density * (velocity ^ 2) * Area * Drag_Coefficient
         """
+        self._polar_forces['drag_force'] = ('drag_coefficient', density)
+        self.invalidate_interpolators('drag_force')
+
+    def polar_at_velocities(self, velocities, polar=None):
+        """
+        Broadcast the polars over given velocities and calculate the forces at them.
+
+        A single polar is repeated as it is. With polars at many Reynolds numbers, the angles of attack of the polar
+        nearest to the Reynolds number of every velocity are taken and the coefficients are interpolated between the
+        polars around it.
+
+        Parameters:
+            velocities (float or array-like): inlet velocity(ies), any values can be used.
+            polar (pd.DataFrame): rows of the polars to broadcast, by default all.
+
+        Returns:
+            pd.DataFrame: the rows of the polar repeated for every velocity (the velocities are the outer loop), with
+            inlet_vel column and the force columns calculated with calculate_lift / calculate_drag.
+        """
+        polar = self.data if polar is None else polar
+        velocities = np.atleast_1d(np.asarray(velocities, dtype='float64'))
+
+        if self.velocity_independent:
+            df = pd.DataFrame({column: np.tile(polar[column].values, len(velocities)) for column in polar.columns})
+            df['inlet_vel'] = np.repeat(velocities, len(polar))
+        else:
+            reynolds_axis, _ = self._get_interpolator(None, 'reynolds')
+            reynolds = self.reynolds_numbers(velocities)
+            lower, weight = _reynolds_bracket(reynolds_axis, reynolds)
+            nearest = reynolds_axis[lower + (weight >= 0.5)]
+
+            rows = [polar[polar['reynolds_number'] == value] for value in nearest]
+            counts = [len(row) for row in rows]
+            df = pd.concat(rows, ignore_index=True)
+            df['inlet_vel'] = np.repeat(velocities, counts)
+            df['reynolds_number'] = np.repeat(reynolds, counts)
+            for column in self._polar_columns():
+                df[column] = self._get_interpolator(column, 'polar')(df['angle_of_attack'].values,
+                                                                     df['inlet_vel'].values)
+
+        for force_column, (coefficient_column, density) in self._polar_forces.items():
+            df[force_column] = (1 / 2) * density * pow(df['inlet_vel'], 2) * self.m2_foil_area * df[coefficient_column]
+        return df
+
+    def _polar_columns(self):
+        """
+        Columns of the polars interpolated over angle of attack and Reynolds number.
+        """
+        return [column for column in self.data.columns if column not in _POLAR_AXES]
+
+    def _find_reynolds_index(self):
+        """
+        Build the index of the polars.
+
+        Returns:
+            (np.ndarray, np.ndarray): sorted Reynolds numbers of the polars (NaN for a single polar without Reynolds
+            number) and the offsets of the blocks of rows of every polar, the rows of i-th polar are
+            offsets[i]:offsets[i + 1].
+        """
+        dataset = self.dataset
+        if 'reynolds_number' not in dataset:
+            return np.array([np.nan]), np.array([0, len(dataset)])
+
+        reynolds = dataset['reynolds_number']
+        if np.any(np.diff(reynolds) < 0):
+            raise ValueError(f"Polars of {self.foil_name} aren't sorted by the Reynolds number, clean the data first.")
 
-        self.data['drag_force'] = (1 / 2) * density * pow(self.data['inlet_vel'], 2) * self.m2_foil_area * self.data['drag_coefficient']
+        reynolds_axis, starts = np.unique(reynolds, return_index=True)
+        return reynolds_axis, np.append(starts, len(reynolds))
+
+    def _build_polar_interpolator(self, column_name):
+        """
+        Fit the interpolator of given column of the polars, see _PolarInterpolator.
+        """
+        reynolds_axis, offsets = self._get_interpolator(None, 'reynolds')
+        reynolds_factor = self.reynolds_numbers(1.0) if len(reynolds_axis) > 1 else None
+
+        force_factor = None
+        if column_name in self._polar_forces:
+            column_name, density = self._polar_forces[column_name]
+            force_factor = (1 / 2) * density * self.m2_foil_area
+
+        # The rows of every polar are a block of the dataset
+        polar_angles = []
+        polar_values = []
+        aoa = self.dataset['angle_of_attack']
+        values = self.dataset[column_name]
+        for start, stop in zip(offsets[:-1], offsets[1:]):
+            order = np.argsort(aoa[start:stop], kind='stable')
+            polar_angles.append(aoa[start:stop][order])
+            polar_values.append(values[start:stop][order])
+
+        return _PolarInterpolator(reynolds_axis, polar_angles, polar_values, reynolds_factor, force_factor)
+
+    def _build_polar_solver(self, column_name):
+        """
+        Build the AngleOfAttackSolver of the polars, every polar is placed at the velocity of its Reynolds number.
+        """
+        dataset = self.dataset
+        velocities = None
+        if not self.velocity_independent:
+            velocities = dataset['reynolds_number'] / self.reynolds_numbers(1.0)
+        return AngleOfAttackSolver.from_polar(dataset['angle_of_attack'], dataset[column_name], velocities)
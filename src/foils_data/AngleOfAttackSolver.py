@@ -0,0 +1,240 @@
+import copy
+
+import numpy as np
+
+# Number of velocities at which the envelope of maximal lift coefficient is tabulated
+ENVELOPE_POINTS = 2001
+
+# Highest velocity of the envelope of polars, whose lift coefficients are extended beyond their velocities [m/s]
+POLAR_ENVELOPE_MAX_VELOCITY = 30.0
+
+# Maximal number of (angle, query) elements of the intermediate arrays of solve, larger inputs are solved in batches
+SOLVE_BATCH_ELEMENTS = 1 << 21
+
+
+class AngleOfAttackSolver:
+    """
+    Inverse lookup of the angle of attack which gives the required lift coefficient at a given velocity.
+
+    The lift coefficient vs velocity curve of every angle of attack is sorted and stored once, so solving many
+    (velocity, lift_coefficient) pairs only needs one linear interpolation per angle and a vectorized inversion.
+    """
+    def __init__(self, angles_of_attack, velocities, lift_coefficients):
+        """
+        Parameters:
+            angles_of_attack (array-like): angle of attack of every data point.
+            velocities (array-like): inlet velocity of every data point.
+            lift_coefficients (array-like): lift coefficient of every data point.
+        """
+        angles_of_attack = np.asarray(angles_of_attack, dtype='float64')
+        velocities = np.asarray(velocities, dtype='float64')
+        lift_coefficients = np.asarray(lift_coefficients, dtype='float64')
+
+        self.angles = np.unique(angles_of_attack)
+        self.velocity_curves = []
+        self.lift_coefficient_curves = []
+        for angle in self.angles:
+            mask = angles_of_attack == angle
+            order = np.argsort(velocities[mask], kind='stable')
+            self.velocity_curves.append(velocities[mask][order])
+            self.lift_coefficient_curves.append(lift_coefficients[mask][order])
+
+        # Curves of polars (see from_polar) are extended as constants beyond their velocities
+        self.polar = False
+        self._envelope = None
+
+    @classmethod
+    def from_data(cls, df):
+        """
+        Create the solver from a DataFrame (or FoilDataset) with angle_of_attack, inlet_vel and lift_coefficient
+        columns. Data without inlet_vel column is a single velocity-independent polar (see from_polar).
+        """
+        if 'inlet_vel' not in df.columns:
+            if 'reynolds_number' in df.columns and len(np.unique(np.asarray(df['reynolds_number']))) > 1:
+                raise ValueError("Polars at many Reynolds numbers need the chord length to be placed at velocities, "
+                                 "use FoilManager.get_angle_of_attack_solver.")
+            return cls.from_polar(np.asarray(df['angle_of_attack']), np.asarray(df['lift_coefficient']))
+        return cls(np.asarray(df['angle_of_attack']), np.asarray(df['inlet_vel']), np.asarray(df['lift_coefficient']))
+
+    @classmethod
+    def from_polar(cls, angles_of_attack, lift_coefficients, velocities=None):
+        """
+        Create the solver of polars (e.g. from XFoil). The lift coefficient curves are interpolated between the
+        velocities of the polars and are constant beyond them, so any velocity can be solved.
+
+        Parameters:
+            angles_of_attack (array-like): angle of attack of every point of the polars.
+            lift_coefficients (array-like): lift coefficient of every point of the polars.
+            velocities (array-like): velocity of the polar of every point (from its Reynolds number), by default the
+                points are a single velocity-independent polar.
+        """
+        angles_of_attack = np.asarray(angles_of_attack, dtype='float64')
+        if velocities is None:
+            velocities = np.zeros(len(angles_of_attack))
+        solver = cls(angles_of_attack, velocities, lift_coefficients)
+        solver.polar = True
+        return solver
+
+    def with_points(self, angles_of_attack, velocities, lift_coefficients):
+        """
+        Create a solver with new data points added, e.g. new simulation cases.
+
+        Only the curves of the angles of the new points are rebuilt, the curves of the other angles are shared with
+        this solver. A new point at the velocity of an existing point of the same angle replaces it.
+
+        Parameters:
+            angles_of_attack (array-like): angle of attack of every new data point.
+            velocities (array-like): inlet velocity of every new data point.
+            lift_coefficients (array-like): lift coefficient of every new data point.
+
+        Returns:
+            AngleOfAttackSolver: the updated solver, this one isn't changed.
+        """
+        angles_of_attack = np.asarray(angles_of_attack, dtype='float64')
+        velocities = np.asarray(velocities, dtype='float64')
+        lift_coefficients = np.asarray(lift_coefficients, dtype='float64')
+
+        curves = dict(zip(self.angles, zip(self.velocity_curves, self.lift_coefficient_curves)))
+        for angle in np.unique(angles_of_attack):
+            mask = angles_of_attack == angle
+            curve_vel, curve_cl = curves.get(angle, (np.empty(0), np.empty(0)))
+            kept = ~np.isin(curve_vel, velocities[mask])
+            curve_vel = np.concatenate([curve_vel[kept], velocities[mask]])
+            curve_cl = np.concatenate([curve_cl[kept], lift_coefficients[mask]])
+            order = np.argsort(curve_vel, kind='stable')
+            curves[angle] = (curve_vel[order], curve_cl[order])
+
+        solver = copy.copy(self)
+        solver.angles = np.array(sorted(curves))
+        solver.velocity_curves = [curves[angle][0] for angle in solver.angles]
+        solver.lift_coefficient_curves = [curves[angle][1] for angle in solver.angles]
+        solver._envelope = None
+        return solver
+
+    def lift_coefficients_at(self, velocities):
+        """
+        Interpolate the lift coefficient of every angle of attack at given velocities.
+
+        Parameters:
+            velocities (array-like): 1D array of velocities.
+
+        Returns:
+            np.ndarray: array of shape (number of angles, number of velocities), NaN where the velocity is outside
+            the range of data of the angle.
+        """
+        velocities = np.asarray(velocities, dtype='float64')
+        lift_coefficients = np.full((len(self.angles), len(velocities)), np.nan)
+
+        for idx, (curve_vel, curve_cl) in enumerate(zip(self.velocity_curves, self.lift_coefficient_curves)):
+            if self.polar:
+                # np.interp keeps the end values beyond the curve
+                lift_coefficients[idx] = np.interp(velocities, curve_vel, curve_cl)
+                continue
+            # Velocities outside the range of this angle can't be interpolated, the angle is skipped for them
+            in_range = (velocities >= curve_vel[0]) & (velocities <= curve_vel[-1])
+            lift_coefficients[idx, in_range] = np.interp(velocities[in_range], curve_vel, curve_cl)
+
+        return lift_coefficients
+
+    def lift_coefficient_envelope(self):
+        """
+        Maximal lift coefficient reachable within the tabulated angles of attack, as a function of velocity.
+
+        The envelope is tabulated once on ENVELOPE_POINTS velocities covering the data (from 0 up to at least
+        POLAR_ENVELOPE_MAX_VELOCITY for polars) and kept for later calls.
+
+        Returns:
+            (np.ndarray, np.ndarray): velocities and maximal lift coefficients at them (NaN where no angle has data).
+        """
+        if self._envelope is None:
+            if self.polar:
+                velocities = np.linspace(0.0, max(POLAR_ENVELOPE_MAX_VELOCITY,
+                                                  max(curve[-1] for curve in self.velocity_curves)), ENVELOPE_POINTS)
+            else:
+                velocities = np.linspace(min(curve[0] for curve in self.velocity_curves),
+                                         max(curve[-1] for curve in self.velocity_curves), ENVELOPE_POINTS)
+            lift_coefficients = self.lift_coefficients_at(velocities)
+            max_lift_coefficients = np.full(len(velocities), np.nan)
+            has_data = ~np.isnan(lift_coefficients).all(axis=0)
+            max_lift_coefficients[has_data] = np.nanmax(lift_coefficients[:, has_data], axis=0)
+            self._envelope = (velocities, max_lift_coefficients)
+
+        return self._envelope
+
+    def solve(self, velocities, lift_coefficients, strict: bool = True):
+        """
+        Find the angles of attack which give the desired lift coefficients at given velocities.
+
+        Parameters:
+            velocities (float or array-like): inlet velocity(ies).
+            lift_coefficients (float or array-like): desired lift coefficient(s), broadcast against the velocities.
+            strict (bool): if True a ValueError is raised for the first pair that can't be solved, otherwise NaN is
+                returned for such pairs.
+
+        Returns:
+            Angle(s) of attack, shaped like the broadcast inputs.
+        """
+        velocities, lift_coefficients = np.broadcast_arrays(np.asarray(velocities, dtype='float64'),
+                                                            np.asarray(lift_coefficients, dtype='float64'))
+        shape = velocities.shape
+        velocities = velocities.ravel()
+        lift_coefficients = lift_coefficients.ravel()
+
+        # The curves of all angles are interpolated for every query, so the queries are split into batches to bound
+        # the memory on datasets with many angles
+        batch_size = max(1, SOLVE_BATCH_ELEMENTS // len(self.angles))
+        angles = np.empty(len(velocities))
+        for start in range(0, len(velocities), batch_size):
+            batch = slice(start, start + batch_size)
+            angles[batch] = self._solve_batch(velocities[batch], lift_coefficients[batch], strict)
+
+        return angles.reshape(shape)[()]
+
+    def _solve_batch(self, velocities, lift_coefficients, strict):
+        """
+        Solve 1D arrays of velocities and lift coefficients, see solve.
+        """
+        curves = self.lift_coefficients_at(velocities)
+        valid = ~np.isnan(curves)
+        valid_count = valid.sum(axis=0)
+        no_data = valid_count == 0
+
+        cl_min = np.where(valid, curves, np.inf).min(axis=0)
+        cl_max = np.where(valid, curves, -np.inf).max(axis=0)
+        out_of_range = ~no_data & ((lift_coefficients < cl_min) | (lift_coefficients > cl_max))
+
+        if strict:
+            if no_data.any():
+                idx = np.argmax(no_data)
+                raise ValueError(f"No data available to interpolate for inlet_vel={velocities[idx]}")
+            if out_of_range.any():
+                idx = np.argmax(out_of_range)
+                raise ValueError(
+                    f"Desired lift coefficient {lift_coefficients[idx]} is outside the achievable range "
+                    f"[{cl_min[idx]}, {cl_max[idx]}] at inlet_vel={velocities[idx]}"
+                )
+
+        # Interpolate angle_of_attack as a function of lift_coefficient, NaN values are sorted to the end
+        order = np.argsort(curves, axis=0)
+        curves_sorted = np.take_along_axis(curves, order, axis=0)
+        angles_sorted = self.angles[order]
+
+        # Index of the segment [j, j + 1] of the sorted curve which contains the desired lift coefficient
+        j = (curves_sorted <= lift_coefficients).sum(axis=0) - 1
+        last = np.maximum(valid_count - 1, 0)
+        j = np.clip(j, 0, np.maximum(last - 1, 0))
+        columns = np.arange(len(velocities))
+
+        cl_left = curves_sorted[j, columns]
+        cl_right = curves_sorted[np.minimum(j + 1, last), columns]
+        angle_left = angles_sorted[j, columns]
+        angle_right = angles_sorted[np.minimum(j + 1, last), columns]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            angles = angle_left + (lift_coefficients - cl_left) * (angle_right - angle_left) / (cl_right - cl_left)
+        # The upper end of the curve (and curves with a single point) is taken directly
+        at_end = lift_coefficients >= curves_sorted[last, columns]
+        angles = np.where(at_end, angles_sorted[last, columns], angles)
+        angles[no_data | out_of_range] = np.nan
+
+        return angles
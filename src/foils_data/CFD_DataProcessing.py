@@ -1,9 +1,51 @@
 import numpy as np
-from scipy.interpolate import griddata, interp1d, Rbf
+from src.foils_data.AngleOfAttackSolver import AngleOfAttackSolver
 from src.utilities.Constants import WATER_DENSITY
+from src.utilities.Profiling import profiled
+
+# Columns returned by get_interpolated_values when no columns are requested explicitly
+INTERPOLATED_COLUMNS = ['lift_coefficient', 'drag_coefficient', 'drag_force_pylon', 'drag_force_mocowanie',
+                        'drag_force_gondola', 'moment', 'pressure_center']
+
+# Number of query points evaluated at once by the RBF batch evaluation, limits the size of the distance matrix
+RBF_BATCH_SIZE = 10000
+
+# Interpolation backends available for 2D (angle_of_attack, velocity) interpolation
+INTERPOLATION_BACKENDS = ['auto', 'rbf', 'linear', 'cubic']
+
+# Minimal fraction of (angle_of_attack, velocity) grid nodes that have to be present in the data to use the grid
+# backends, the missing nodes are filled with the RBF interpolation
+GRID_MIN_FILL_RATIO = 0.97
+
+
+class _GridInterpolator:
+    """
+    Interpolator of a full grid of (angle_of_attack, velocity) nodes with the same call signature as Rbf:
+    interpolator(angle_of_attack, velocity).
+    """
+    def __init__(self, aoa_axis, vel_axis, values, method):
+        from scipy.interpolate import NdBSpline, RegularGridInterpolator, make_interp_spline
+
+        if method == 'cubic':
+            # The tensor product spline is the same as the one of RegularGridInterpolator(method='cubic'), but its
+            # coefficients are solved axis by axis with banded solvers instead of one (n_aoa * n_vel)^2 system, so
+            # the grid nodes are reproduced exactly and large grids are fitted quickly
+            aoa_spline = make_interp_spline(aoa_axis, values, k=3, axis=0)
+            vel_spline = make_interp_spline(vel_axis, aoa_spline.c, k=3, axis=1)
+            self.interpolator = NdBSpline((aoa_spline.t, vel_spline.t), np.moveaxis(vel_spline.c, 0, 1), 3,
+                                          extrapolate=True)
+        else:
+            self.interpolator = RegularGridInterpolator((aoa_axis, vel_axis), values, method=method,
+                                                        bounds_error=False, fill_value=None)
+
+    def __call__(self, angle_of_attack, velocity):
+        aoa, vel = np.broadcast_arrays(np.asarray(angle_of_attack, dtype='float64'),
+                                       np.asarray(velocity, dtype='float64'))
+        return self.interpolator(np.stack([aoa, vel], axis=-1)).reshape(aoa.shape)
 
 
 class CFD_DataProcessingMixin:
+    @profiled(record_data=True)
     def calculate_lift_coefficient(self):
         """
         Calculate the lift coefficient using lift force.
@@ -14,7 +56,9 @@ class CFD_DataProcessingMixin:
         """
         self.data['lift_coefficient'] = (2 * self.data['lift_force']) / (
                 WATER_DENSITY * pow(self.data['inlet_vel'], 2) * self.m2_foil_area)
+        self.invalidate_interpolators('lift_coefficient')
 
+    @profiled(record_data=True)
     def calculate_drag_coefficient(self):
         """
         Calculate the drag coefficient using drag force.
@@ -25,7 +69,9 @@ class CFD_DataProcessingMixin:
         """
         self.data['drag_coefficient'] = (2 * self.data['drag_force']) / (
                 WATER_DENSITY * pow(self.data['inlet_vel'], 2) * self.m2_foil_area)
+        self.invalidate_interpolators('drag_coefficient')
 
+    @profiled(record_data=True)
     def calculate_cl_cd(self):
         """
         Calculate lift coefficient vs drag coefficient (effectiveness of foil).
@@ -35,7 +81,9 @@ class CFD_DataProcessingMixin:
         cl_cd = cl / cd
         """
         self.data['cl_cd'] = self.data['lift_coefficient'] / self.data['drag_coefficient']
+        self.invalidate_interpolators('cl_cd')
 
+    @profiled(record_data=True)
     def calculate_moment_coefficient(self):
         """
         Calculate the moment coefficient using moment force.
@@ -52,7 +100,9 @@ class CFD_DataProcessingMixin:
 
         self.data['moment_coefficient'] = 2 * self.data['moment'] / (
                     WATER_DENSITY * pow(self.data['inlet_vel'], 2) * self.m2_foil_area * self.m_chord_length)
+        self.invalidate_interpolators('moment_coefficient')
 
+    @profiled(record_data=True)
     def calculate_pressure_center(self, x1=0.0):
         """
         Calculate the pressure center of a foil, where the returning value is value (0,1) representing position on the foil
@@ -71,11 +121,166 @@ class CFD_DataProcessingMixin:
             x1 - position of the axis on the chord for which moment coefficient is calculated
         """
         self.data['pressure_center'] = -(x1 - self.data['moment_coefficient'] / self.data['lift_coefficient'])
+        self.invalidate_interpolators('pressure_center')
+
+    def invalidate_interpolators(self, column_name=None):
+        """
+        Drop cached interpolators, so they are fitted again on the next query. The dataset snapshot and the indexes of
+        the filters are dropped and data_version is increased on any change.
+
+        Parameters:
+            column_name (str): column whose interpolators should be dropped. If None, the whole cache is cleared.
+        """
+        self.data_version += 1
+        self._dataset = None
+        self._group_indexes.clear()
+        if column_name is None:
+            self._interpolators.clear()
+            return
+
+        for key in [key for key in self._interpolators if key[0] == column_name]:
+            del self._interpolators[key]
+
+    def _get_interpolator(self, column_name, method):
+        """
+        Return the interpolator of given column fitted with given method, building it only on the first call.
+        """
+        key = (column_name, method)
+        interpolator = self._interpolators.get(key)
+        if interpolator is None:
+            interpolator = self._build_interpolator(column_name, method)
+            self._interpolators[key] = interpolator
+        return interpolator
+
+    @profiled(name=lambda self, column_name, method: f'build_interpolator[{method}]')
+    def _build_interpolator(self, column_name, method):
+        """
+        Fit the interpolator of given column over the current data.
+
+        Parameters:
+            column_name (str): name of the column to interpolate.
+            method (str): 'interp1d' for 1D cubic interpolation over velocity, 'rbf' for 2D RBF interpolation over
+                (angle_of_attack, velocity), 'linear' or 'cubic' for 2D interpolation over the regular grid of
+                (angle_of_attack, velocity), 'grid' for the grid axes of the data (column_name is ignored),
+                'inverse_aoa' for the AngleOfAttackSolver of the lift_coefficient column, 'polar' for the
+                interpolation of AFT polars over angle_of_attack and Reynolds number, 'reynolds' for the Reynolds
+                number index of the polars (column_name is ignored), see AFT_DataProcessingMixin.
+        """
+        # scipy is imported only when the first interpolator is built, it is slow to import
+        from scipy.interpolate import interp1d, Rbf
+
+        if self.is_polar:
+            if method == 'reynolds':
+                return self._find_reynolds_index()
+            elif method == 'inverse_aoa':
+                return self._build_polar_solver(column_name)
+            elif method == 'polar':
+                return self._build_polar_interpolator(column_name)
+            raise ValueError(f"Data of {self.foil_name} are AFT polars, they are interpolated only with the 'polar' "
+                             f"method.")
+
+        dataset = self.dataset
+        vel = dataset['inlet_vel']
+        aoa = dataset['angle_of_attack']
+
+        if method == 'grid':
+            return self._find_grid_axes(aoa, vel)
+        elif method == 'inverse_aoa':
+            return AngleOfAttackSolver(aoa, vel, dataset[column_name])
+
+        values = dataset[column_name]
+
+        if method == 'interp1d':
+            return interp1d(vel, values, kind='cubic')
+        elif method == 'rbf':
+            return Rbf(aoa, vel, values, function='multiquadric')
+        elif method in ('linear', 'cubic'):
+            grid = self._get_interpolator(None, 'grid')
+            if grid is False:
+                raise ValueError(f"Data of {self.foil_name} doesn't form a regular (angle_of_attack, velocity) grid, "
+                                 f"use 'rbf' interpolation backend.")
+            aoa_axis, vel_axis, aoa_idx, vel_idx = grid
+
+            grid_values = np.full((len(aoa_axis), len(vel_axis)), np.nan)
+            grid_values[aoa_idx, vel_idx] = values
+
+            # Fill the missing nodes of the grid with the RBF interpolation
+            missing_aoa_idx, missing_vel_idx = np.nonzero(np.isnan(grid_values))
+            if len(missing_aoa_idx):
+                rbf = self._get_interpolator(column_name, 'rbf')
+                grid_values[missing_aoa_idx, missing_vel_idx] = rbf(aoa_axis[missing_aoa_idx],
+                                                                    vel_axis[missing_vel_idx])
+
+            return _GridInterpolator(aoa_axis, vel_axis, grid_values, method)
+        else:
+            raise ValueError(f"Unknown interpolation method: {method}")
+
+    @staticmethod
+    def _find_grid_axes(aoa, vel):
+        """
+        Check if the data points form a regular grid of angle_of_attack x velocity.
+
+        Returns:
+            (aoa_axis, vel_axis, aoa_idx, vel_idx) - sorted unique axes and the grid indices of every row, or False if
+            the points are scattered.
+        """
+        aoa_axis, aoa_idx = np.unique(aoa, return_inverse=True)
+        vel_axis, vel_idx = np.unique(vel, return_inverse=True)
+
+        if len(aoa_axis) < 2 or len(vel_axis) < 2:
+            return False
+
+        # Every node can appear only once
+        nodes = aoa_idx * len(vel_axis) + vel_idx
+        if len(np.unique(nodes)) != len(nodes):
+            return False
 
+        if len(nodes) < GRID_MIN_FILL_RATIO * len(aoa_axis) * len(vel_axis):
+            return False
+
+        return aoa_axis, vel_axis, aoa_idx, vel_idx
+
+    def _get_interpolation_method(self):
+        """
+        Resolve the interpolation_backend option to the 2D interpolation method used for the current data.
+        """
+        backend = self.interpolation_backend
+        if backend not in INTERPOLATION_BACKENDS:
+            raise ValueError(f"Unknown interpolation backend: {backend}, available: {INTERPOLATION_BACKENDS}")
+
+        # AFT polars are interpolated over angle_of_attack and the Reynolds number of the velocity
+        if self.is_polar:
+            return 'polar'
+
+        if backend == 'rbf':
+            return 'rbf'
+
+        grid = self._get_interpolator(None, 'grid')
+        if grid is False:
+            if backend != 'auto':
+                raise ValueError(f"Data of {self.foil_name} doesn't form a regular (angle_of_attack, velocity) "
+                                 f"grid, use 'rbf' interpolation backend.")
+            return 'rbf'
+
+        aoa_axis, vel_axis = grid[0], grid[1]
+        if backend == 'auto':
+            backend = 'cubic'
+        # Cubic interpolation needs at least 4 nodes along each axis
+        if backend == 'cubic' and (len(aoa_axis) < 4 or len(vel_axis) < 4):
+            return 'linear'
+        return backend
+
+    @profiled()
     def get_interpolated_value(self, column_name, angle_of_attack, velocity):
         """
         Generic method to get the interpolated value for a given column using cubic interpolation.
 
+        The interpolator of each column is fitted once and cached until the data changes. The 2D interpolation
+        backend is selected with the interpolation_backend option of FoilManager: 'auto' uses the cubic interpolation
+        over the regular grid if the data forms one and RBF otherwise, 'rbf', 'linear' and 'cubic' force the backend.
+        AFT polars are interpolated over angle_of_attack and the Reynolds number of the velocity, and their forces are
+        scaled to the velocity.
+
         Parameters:
         - column_name: str, the foil_name of the column to interpolate.
         - angle_of_attack: float or array-like, the angle(s) of attack at which to interpolate.
@@ -84,7 +289,7 @@ class CFD_DataProcessingMixin:
         Returns:
         - Interpolated value(s) at the specified angle(s) of attack and velocity(ies).
         """
-        unique_aoa = np.unique(self.data['angle_of_attack'].values)
+        unique_aoa = self.dataset.angle_axis
 
         if len(unique_aoa) == 1:
             # Only one unique angle of attack in the dataset
@@ -93,70 +298,146 @@ class CFD_DataProcessingMixin:
                 raise ValueError(f"Requested angle of attack {angle_of_attack}° is not available in the dataset.")
 
             # Perform 1D interpolation over velocity
-            vel = self.data['inlet_vel'].values
-            values = self.data[column_name].values
-            interpolator = interp1d(vel, values, kind='cubic')
+            interpolator = self._get_interpolator(column_name, 'interp1d')
             return interpolator(velocity)
         else:
-            # Perform 2D interpolation over (angle_of_attack, velocity) using RBF with extrapolation
-            aoa = self.data['angle_of_attack'].values
-            vel = self.data['inlet_vel'].values
-            values = self.data[column_name].values
-
-            # Create RBF interpolator
-            interpolator = Rbf(aoa, vel, values, function='multiquadric')
+            # Perform 2D interpolation over (angle_of_attack, velocity) with extrapolation, on the regular grid if
+            # the data forms one, otherwise using RBF
+            interpolator = self._get_interpolator(column_name, self._get_interpolation_method())
 
             # Interpolate at the requested point
             return interpolator(angle_of_attack, velocity)
 
+    @profiled()
+    def get_interpolated_values(self, angles_of_attack, velocities, columns=None):
+        """
+        Vectorized version of get_interpolated_value, which interpolates many columns for many points at once.
+
+        The backend is selected the same way as in get_interpolated_value. The RBF interpolators of all columns share
+        the same nodes, so the distance matrix between the queried points and the nodes is computed once per batch and
+        reused for every column.
+
+        Parameters:
+            angles_of_attack (float or array-like): angle(s) of attack at which to interpolate.
+            velocities (float or array-like): velocity(ies) at which to interpolate, broadcast against the angles.
+            columns (list): names of the columns to interpolate. By default all INTERPOLATED_COLUMNS available in
+                the data.
+
+        Returns:
+            np.ndarray: structured array with one float64 field per column, shaped like the broadcast inputs.
+        """
+        if columns is None:
+            columns = [column for column in INTERPOLATED_COLUMNS if column in self.dataset]
+
+        aoa, vel = np.broadcast_arrays(np.asarray(angles_of_attack, dtype='float64'),
+                                       np.asarray(velocities, dtype='float64'))
+        result = np.empty(aoa.shape, dtype=[(column, 'float64') for column in columns])
+
+        unique_aoa = self.dataset.angle_axis
+
+        if len(unique_aoa) == 1:
+            # Only one unique angle of attack in the dataset
+            if not np.all(np.isclose(aoa, unique_aoa[0])):
+                raise ValueError(f"Requested angles of attack are not available in the dataset, "
+                                 f"only {unique_aoa[0]}° is.")
+
+            for column in columns:
+                result[column] = self._get_interpolator(column, 'interp1d')(vel)
+            return result
+
+        method = self._get_interpolation_method()
+        interpolators = [self._get_interpolator(column, method) for column in columns]
+        if not interpolators:
+            return result
+
+        if method != 'rbf':
+            for column, interpolator in zip(columns, interpolators):
+                result[column] = interpolator(aoa, vel)
+            return result
+
+        # All interpolators are fitted on the same (angle_of_attack, velocity) nodes with the same epsilon
+        nodes_aoa, nodes_vel = interpolators[0].xi
+        epsilon = interpolators[0].epsilon
+        weights = np.column_stack([interpolator.nodes for interpolator in interpolators])
+
+        flat_aoa = aoa.ravel()
+        flat_vel = vel.ravel()
+        flat_values = np.empty((len(flat_aoa), len(columns)))
+        for start in range(0, len(flat_aoa), RBF_BATCH_SIZE):
+            batch = slice(start, start + RBF_BATCH_SIZE)
+            r2 = (flat_aoa[batch, None] - nodes_aoa) ** 2 + (flat_vel[batch, None] - nodes_vel) ** 2
+            # Multiquadric kernel, the same as used by Rbf(function='multiquadric')
+            flat_values[batch] = np.sqrt(r2 / epsilon ** 2 + 1) @ weights
+
+        for idx, column in enumerate(columns):
+            result[column] = flat_values[:, idx].reshape(aoa.shape)
+        return result
+
+    def get_angle_of_attack_solver(self):
+        """
+        Get the AngleOfAttackSolver of the foil, which finds the angle of attack for the required lift coefficient.
+
+        The solver is built once and cached until the lift coefficient data changes.
+        """
+        return self._get_interpolator('lift_coefficient', 'inverse_aoa')
+
+    @profiled()
     def get_interpolated_lift_force(self, angle_of_attack, velocity):
         """
         Get the interpolated lift force.
         """
         return self.get_interpolated_value('lift_force', angle_of_attack, velocity)
 
+    @profiled()
     def get_interpolated_drag_coefficient(self, angle_of_attack, velocity):
         """
         Get the interpolated drag coefficient.
         """
         return self.get_interpolated_value('drag_coefficient', angle_of_attack, velocity)
 
+    @profiled()
     def get_interpolated_lift_coefficient(self, angle_of_attack, velocity):
         """
         Get the interpolated lift coefficient.
         """
         return self.get_interpolated_value('lift_coefficient', angle_of_attack, velocity)
 
+    @profiled()
     def get_interpolated_drag_force_foil(self, angle_of_attack, velocity):
         """
         Get the interpolated drag force of the foil.
         """
         return self.get_interpolated_value('drag_force', angle_of_attack, velocity)
 
+    @profiled()
     def get_interpolated_drag_force_pylon(self, angle_of_attack, velocity):
         """
         Get the interpolated drag force of the pylon.
         """
         return self.get_interpolated_value('drag_force_pylon', angle_of_attack, velocity)
 
+    @profiled()
     def get_interpolated_drag_force_mocowanie(self, angle_of_attack, velocity):
         """
         Get the interpolated drag force of the mocowanie.
         """
         return self.get_interpolated_value('drag_force_mocowanie', angle_of_attack, velocity)
 
+    @profiled()
     def get_interpolated_drag_force_gondola(self, angle_of_attack, velocity):
         """
         Get the interpolated drag force of the gondola.
         """
         return self.get_interpolated_value('drag_force_gondola', angle_of_attack, velocity)
 
+    @profiled()
     def get_interpolated_moment(self, angle_of_attack, velocity):
         """
         Get the interpolated moment.
         """
         return self.get_interpolated_value('moment', angle_of_attack, velocity)
 
+    @profiled()
     def get_interpolated_pressure_center(self, angle_of_attack, velocity):
         """
         Get the interpolated pressure center of a foil.
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.utilities.Profiling import profiled
+
+# Directory where processed datasets are cached, by default in the root of the repository
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / '..' / '..' / '.foil_cache'
+
+# Version of the processing pipeline, it is a part of every cache key. Bump it whenever the processed data changes
+# (parsing of the csv files, cleaning, columns or layout of the rows, e.g. AFT polars stored once with their
+# reynolds_number instead of replicated over velocities), so the cache files written by older code aren't reused.
+CACHE_VERSION = 2
+
+# Name of the array which stores the index of the DataFrame in the cache file
+_INDEX_KEY = '__index__'
+
+
+def cache_key(file_path, *parameters):
+    """
+    Compute the cache key of a processed dataset.
+
+    Parameters:
+        file_path (str): path to the source csv file, its content is hashed. Directories of AFT polars aren't cached,
+            see foil_manager_procedure.
+        parameters: processing parameters which change the processed data (results_type, area, chord, flags...).
+
+    Returns:
+        str: hex digest identifying the processed dataset.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(repr((CACHE_VERSION,) + parameters).encode())
+    return digest.hexdigest()
+
+
+def cache_path(key, cache_dir=None):
+    """
+    Path of the cache file for given cache key.
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+    return cache_dir.resolve() / f'{key}.npz'
+
+
+@profiled()
+def load_cached_data(path):
+    """
+    Load a processed DataFrame from the cache.
+
+    Returns:
+        pd.DataFrame or None if the dataset isn't cached.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path, allow_pickle=False) as cached:
+        columns = [name for name in cached.files if name != _INDEX_KEY]
+        return pd.DataFrame({name: cached[name] for name in columns}, index=cached[_INDEX_KEY])
+
+
+@profiled()
+def save_cached_data(path, df):
+    """
+    Save a processed DataFrame to the cache. DataFrames with non-numeric columns are not cached.
+    """
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Write to a uniquely named temporary file first, so a concurrent reader never sees a partially written cache file
+    # and concurrent writers (threads or processes) of the same key don't write into the same temporary file
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=f'{os.path.basename(path)}.', suffix='.tmp',
+                                     delete=False) as file:
+        temporary_path = file.name
+        try:
+            np.savez(file, **{_INDEX_KEY: df.index.values}, **{str(name): df[name].values for name in df.columns})
+        except BaseException:
+            file.close()
+            os.remove(temporary_path)
+            raise
+    os.replace(temporary_path, path)
@@ -1,8 +1,8 @@
-import numpy as np
-import pandas as pd
+from src.utilities.Profiling import profiled
 
 
 class DataCleaningMixin:
+    @profiled(record_data=True)
     def clean_data(self):
         """
         Clean the DataFrame by setting headers and removing unnecessary rows/columns.
@@ -19,50 +19,21 @@ class DataCleaningMixin:
             self._clean_data_REAR_DRAG()
         else:
             print("Wrong results_type format !!!")
+        self.invalidate_interpolators()
 
     def _clean_data_REAR_DRAG(self):
-        self.data.columns = self.data.iloc[0]
-        self.data = self.data[1:]
-        self.data.reset_index(drop=True, inplace=True)
-
-        self.data['inlet_vel'] = pd.to_numeric(self.data['inlet_vel'], errors='coerce').astype('float64')
-        self.data['angle_of_attack'] = pd.to_numeric(self.data['angle_of_attack'], errors='coerce').astype('float64')
-        self.data['lift_force'] = pd.to_numeric(self.data['lift_force'], errors='coerce').astype('float64')
-        self.data['drag_force'] = pd.to_numeric(self.data['drag_force'], errors='coerce').astype('float64')
-        self.data['drag_force_pylon'] = pd.to_numeric(self.data['drag_force_pylon'], errors='coerce').astype('float64')
-        self.data['drag_force_mocowanie'] = pd.to_numeric(self.data['drag_force_mocowanie'], errors='coerce').astype(
-            'float64')
-        self.data['drag_force_gondola'] = pd.to_numeric(self.data['drag_force_gondola'], errors='coerce').astype(
-            'float64')
+        # The columns are already parsed to float64 by load_data, only the rows with missing values are removed
         self.data.dropna(inplace=True)
-    def _clean_data_FRONT_DRAG(self):
-        self.data.columns = self.data.iloc[0]
-        self.data = self.data[1:]
-        self.data.reset_index(drop=True, inplace=True)
 
-        self.data['inlet_vel'] = pd.to_numeric(self.data['inlet_vel'], errors='coerce').astype('float64')
-        self.data['angle_of_attack'] = pd.to_numeric(self.data['angle_of_attack'], errors='coerce').astype('float64')
-        self.data['lift_force'] = pd.to_numeric(self.data['lift_force'], errors='coerce').astype('float64')
-        self.data['drag_force'] = pd.to_numeric(self.data['drag_force'], errors='coerce').astype('float64')
-        self.data['drag_force_pylon'] = pd.to_numeric(self.data['drag_force_pylon'], errors='coerce').astype('float64')
-        self.data['drag_force_mocowanie'] = pd.to_numeric(self.data['drag_force_mocowanie'], errors='coerce').astype(
-            'float64')
+    def _clean_data_FRONT_DRAG(self):
+        # The columns are already parsed to float64 by load_data, only the rows with missing values are removed
         self.data.dropna(inplace=True)
 
     def _clean_data_CFD(self):
-        self.data.columns = self.data.iloc[0]
-        self.data = self.data[1:]
-        self.data.reset_index(drop=True, inplace=True)
-
-        # Convert to numeric
-        self.data['inlet_vel'] = pd.to_numeric(self.data['inlet_vel'], errors='coerce').astype('float64')
-        self.data['angle_of_attack'] = pd.to_numeric(self.data['angle_of_attack'], errors='coerce').astype('float64')
-        self.data['moment'] = pd.to_numeric(self.data['moment'], errors='coerce').astype('float64')
-        self.data['lift_force'] = pd.to_numeric(self.data['lift_force'], errors='coerce').astype('float64')
-        self.data['drag_force'] = pd.to_numeric(self.data['drag_force'], errors='coerce').astype('float64')
-        self.data['lift_coefficient'] = pd.to_numeric(self.data['lift_coefficient'], errors='coerce').astype('float64')
-        self.data['drag_coefficient'] = pd.to_numeric(self.data['drag_coefficient'], errors='coerce').astype('float64')
+        # The header is read and the columns are parsed to float64 by load_data, there is nothing more to clean
+        pass
 
+    @profiled(record_data=True)
     def multiply_forces_by_2(self):
 
         # Multiplies by 2 the moment, lift force and drag force column
@@ -82,6 +53,7 @@ class DataCleaningMixin:
             self.data['drag_force_pylon'] = self.data['drag_force_pylon'] * 2
             self.data['drag_force_mocowanie'] = self.data['drag_force_mocowanie'] * 2
             self.data['drag_force_gondola'] = self.data['drag_force_gondola'] * 2
+        self.invalidate_interpolators()
 
     def _clean_data_AFT(self):
         # deleting unnecessary columns
@@ -107,11 +79,8 @@ class DataCleaningMixin:
         # Filer out rows where angle_of_attack is higher than 7.5 deg
         self.data = self.data[~(self.data['angle_of_attack'] > 7.5)]
 
-        # adding rows so the dataframe will match the CFD dataframe
-        velocities = [0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 5.5, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0]
-
-        # Repeat the rows of the second DataFrame to match the number of velocity values
-        self.data = self.data.loc[self.data.index.repeat(len(velocities))].reset_index(drop=True)
-
-        # Tile the velocity values to match the number of rows in the expanded DataFrame
-        self.data['inlet_vel'] = np.tile(velocities, len(self.data) // len(velocities))
+        # The polars don't depend on velocity directly, so they are stored once and broadcast over the requested
+        # velocities only when they are needed (see AFT_DataProcessingMixin.polar_at_velocities). The rows of every
+        # polar stay a contiguous block sorted by the angle of attack, which the Reynolds number index relies on
+        sort_columns = [column for column in ['reynolds_number', 'angle_of_attack'] if column in self.data.columns]
+        self.data = self.data.sort_values(by=sort_columns, kind='stable').reset_index(drop=True)
@@ -1,23 +1,131 @@
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
+from src.utilities.Profiling import profiled
+
+# Numeric columns of the csv files of each results type
+RESULTS_COLUMNS = {
+    'CFD': ['inlet_vel', 'angle_of_attack', 'moment', 'lift_force', 'drag_force', 'lift_coefficient',
+            'drag_coefficient'],
+    'FRONT_DRAG': ['inlet_vel', 'angle_of_attack', 'lift_force', 'drag_force', 'drag_force_pylon',
+                   'drag_force_mocowanie'],
+    'REAR_DRAG': ['inlet_vel', 'angle_of_attack', 'lift_force', 'drag_force', 'drag_force_pylon',
+                  'drag_force_mocowanie', 'drag_force_gondola'],
+}
+
+# First column of the table of an XFoil polar csv file, the lines above it are the metadata of the polar
+POLAR_TABLE_HEADER = 'Alpha'
+
+
+def read_polar(file_path):
+    """
+    Read an XFoil polar csv file (e.g. from airfoiltools.com) with its metadata.
+
+    Parameters:
+        file_path (str): path to the csv file.
+
+    Returns:
+        (dict, pd.DataFrame): metadata of the polar (key -> value of the lines above the table, e.g. 'Reynolds number',
+        'Ncrit') and the table of the polar.
+    """
+    metadata = {}
+    with open(file_path) as file:
+        for header_lines, line in enumerate(file):
+            key, _, value = line.strip().partition(',')
+            if key == POLAR_TABLE_HEADER:
+                break
+            if value:
+                metadata[key] = value
+        else:
+            raise ValueError(f"{file_path} isn't a polar file, it has no table starting with {POLAR_TABLE_HEADER}.")
+
+    return metadata, pd.read_csv(file_path, skiprows=header_lines)
+
 
 class DataLoadingMixin:
     """
     Mixin for loading data from CSV files.
     """
+    @profiled(record_data=True)
     def load_data(self):
         """
         Load data from a CSV file that comes from an AFT or CFD.
 
-        The CSV file should be prepared in a proper format (see README).
+        The CSV file should be prepared in a proper format (see README). The AFT results are an XFoil polar file or a
+        directory of polar files of one airfoil at many Reynolds numbers, see _read_polars.
         """
         if self.results_type == 'AFT':
-            self.data = pd.read_csv(self.file_path, skiprows=9)
-        elif self.results_type == 'CFD':
-            self.data = pd.read_csv(self.file_path, delimiter=';')
-        elif self.results_type == "FRONT_DRAG":
-            self.data = pd.read_csv(self.file_path, delimiter=';')
-        elif self.results_type == "REAR_DRAG":
-            self.data = pd.read_csv(self.file_path, delimiter=';')
+            self.polar_metadata, self.data = self._read_polars(self.file_path)
+        elif self.results_type in RESULTS_COLUMNS:
+            self.data = self._read_results_csv(self.file_path, RESULTS_COLUMNS[self.results_type])
         else:
             print("Wrong results_type format !!!")
+
+    @staticmethod
+    def _read_polars(path):
+        """
+        Read an XFoil polar file, or all polar (*.csv) files of a directory into one table.
+
+        The rows of every polar are labeled with its Reynolds number (reynolds_number column) and the table is sorted
+        by the Reynolds number, so the rows of each polar form a contiguous block. All polars must have the same
+        Ncrit and different Reynolds numbers.
+
+        Parameters:
+            path (str): path to the polar file or to the directory of polar files.
+
+        Returns:
+            (pd.DataFrame, pd.DataFrame): metadata of the polars (file, reynolds_number, ncrit, one row per polar,
+            sorted by the Reynolds number) and the table of all polars.
+        """
+        path = Path(path)
+        files = sorted(path.glob('*.csv')) if path.is_dir() else [path]
+        if not files:
+            raise ValueError(f"There are no polar files in {path}.")
+
+        polars = []
+        for file in files:
+            metadata, polar = read_polar(file)
+            if 'Reynolds number' not in metadata:
+                raise ValueError(f"Polar {file} has no Reynolds number in its header.")
+            polar['reynolds_number'] = float(metadata['Reynolds number'])
+            polars.append(({'file': str(file), 'reynolds_number': float(metadata['Reynolds number']),
+                            'ncrit': float(metadata.get('Ncrit', np.nan))}, polar))
+
+        polar_metadata = pd.DataFrame([metadata for metadata, _ in polars])
+        polar_metadata = polar_metadata.sort_values(by='reynolds_number', kind='stable').reset_index(drop=True)
+
+        if polar_metadata['reynolds_number'].duplicated().any():
+            raise ValueError(f"Polars in {path} have duplicated Reynolds numbers, keep one polar per Reynolds number.")
+        if polar_metadata['ncrit'].nunique(dropna=False) > 1:
+            raise ValueError(f"Polars in {path} have different Ncrit values {polar_metadata['ncrit'].unique()}, "
+                             f"keep polars of one Ncrit.")
+
+        data = pd.concat([polar for _, polar in polars], ignore_index=True)
+        return polar_metadata, data.sort_values(by='reynolds_number', kind='stable').reset_index(drop=True)
+
+    @staticmethod
+    def _read_results_csv(file_path, columns):
+        """
+        Read the semicolon separated CSV file of CFD results in a single pass.
+
+        The first, empty line (;;;;;;) is skipped, so the real header is read directly and the results columns are
+        parsed straight into float64. If a column contains a value which is not a number, the file is read again and
+        such values are converted to NaN.
+
+        Parameters:
+            file_path (str): path to the csv file.
+            columns (list): names of the numeric columns.
+
+        Returns:
+            pd.DataFrame: the loaded data.
+        """
+        dtype = {column: 'float64' for column in columns}
+        try:
+            return pd.read_csv(file_path, delimiter=';', skiprows=1, dtype=dtype)
+        except ValueError:
+            data = pd.read_csv(file_path, delimiter=';', skiprows=1, dtype=str)
+            for column in columns:
+                data[column] = pd.to_numeric(data[column], errors='coerce').astype('float64')
+            return data
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+
+class FoilDataset:
+    """
+    Compact, immutable snapshot of the numeric columns of FoilManager.data, used by the interpolators and solvers.
+
+    All columns are stored in one Fortran-ordered float64 array, so every column is a contiguous read-only array which
+    is read without going through pandas. The sorted unique angles of attack and velocities are computed once. The
+    DataFrame view (frame) shares the memory of the arrays, e.g. for plotting.
+    """
+    __slots__ = ('columns', 'values', 'index', 'angle_axis', 'velocity_axis', 'frame', '_column_positions')
+
+    def __init__(self, columns, values, index=None):
+        """
+        Parameters:
+            columns (list): names of the columns.
+            values (array-like): 2D array of shape (rows, len(columns)), it is copied.
+            index (array-like): labels of the rows of the DataFrame view, by default 0..rows-1.
+        """
+        values = np.array(values, dtype='float64', order='F', ndmin=2)
+        if values.shape[1] != len(columns):
+            raise ValueError(f"Values have {values.shape[1]} columns, but {len(columns)} column names are given.")
+        values.flags.writeable = False
+
+        set_attribute = super().__setattr__
+        set_attribute('columns', tuple(columns))
+        set_attribute('values', values)
+        set_attribute('index', pd.RangeIndex(len(values)) if index is None else pd.Index(index))
+        set_attribute('_column_positions', {column: idx for idx, column in enumerate(self.columns)})
+        set_attribute('angle_axis', np.unique(self['angle_of_attack']) if 'angle_of_attack' in self else None)
+        set_attribute('velocity_axis', np.unique(self['inlet_vel']) if 'inlet_vel' in self else None)
+        set_attribute('frame', pd.DataFrame(values, columns=list(self.columns), index=self.index, copy=False))
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Create the dataset from the numeric columns of a DataFrame, the other columns are skipped.
+        """
+        columns = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column].dtype)]
+        return cls(columns, df[columns].to_numpy(dtype='float64').reshape(len(df), len(columns)), df.index)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FoilDataset is immutable, create a new one from the changed data.")
+
+    def __reduce__(self):
+        # __setattr__ raises, so the dataset is pickled and copied by creating it again from its arrays
+        return FoilDataset, (self.columns, self.values, self.index)
+
+    def __getitem__(self, column):
+        """
+        Get the read-only contiguous array of a column.
+        """
+        try:
+            return self.values[:, self._column_positions[column]]
+        except KeyError:
+            raise KeyError(f"Column {column} isn't in the dataset.") from None
+
+    def __contains__(self, column):
+        return column in self._column_positions
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return f'FoilDataset({len(self)} rows, columns: {", ".join(self.columns)})'
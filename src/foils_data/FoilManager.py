@@ -1,31 +1,137 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
 from src.foils_data.DataLoading import DataLoadingMixin
 from src.foils_data.DataCleaning import DataCleaningMixin
-from src.foils_data.AFT_DataProcessing import AFT_DataProcessingMixin
+from src.foils_data.AFT_DataProcessing import POLAR_VELOCITIES, AFT_DataProcessingMixin
 from src.foils_data.CFD_DataProcessing import CFD_DataProcessingMixin
+from src.foils_data.DataCache import cache_key, cache_path, load_cached_data, save_cached_data
+from src.foils_data.FoilDataset import FoilDataset
+from src.utilities.Profiling import profiled
+
+# Maximal difference between the requested and the stored velocity / angle of attack matched by the filters
+FILTER_TOLERANCE = 1e-5
 
 
+@profiled()
 def foil_manager_procedure(data_type, foil_name, path, area, chord_length, multiply_by_2: bool = True,
-                           calculate_pressure_center: bool = True):
-    data_manager = FoilManager(data_type, foil_name, path, area, chord_length)
+                           calculate_pressure_center: bool = True, interpolation_backend: str = 'auto',
+                           use_cache: bool = True, cache_dir=None):
+    """
+    Create FoilManager and process its data: load, clean, multiply forces by 2 and calculate coefficients.
+
+    The processed data is cached on disk, keyed by the content of the csv file and the processing parameters, so
+    later runs load it directly instead of parsing and processing the csv again. AFT polars aren't cached: they are
+    small, and their polar_metadata isn't a part of the cached data.
+
+    Parameters:
+        use_cache (bool): whether to read and write the cache of processed data.
+        cache_dir (str): directory of the cache, by default DataCache.DEFAULT_CACHE_DIR.
+    """
+    data_manager = FoilManager(data_type, foil_name, path, area, chord_length, interpolation_backend)
+    data_manager.processing_flags = {'multiply_by_2': multiply_by_2,
+                                     'calculate_pressure_center': calculate_pressure_center}
+
+    use_cache = use_cache and data_type != 'AFT'
+    if use_cache:
+        key = cache_key(path, data_type, area, chord_length, multiply_by_2, calculate_pressure_center)
+        data_path = cache_path(key, cache_dir)
+        cached_data = load_cached_data(data_path)
+        if cached_data is not None:
+            data_manager.data = cached_data
+            data_manager.cache_file = data_path
+            return data_manager
 
     data_manager.load_data()
+    _process_data(data_manager)
+
+    if use_cache:
+        save_cached_data(data_path, data_manager.data)
+        data_manager.cache_file = data_path
+
+    return data_manager
+
+
+def _process_data(data_manager):
+    """
+    Process the loaded data of FoilManager: clean, multiply forces by 2 and calculate coefficients, according to the
+    processing_flags of the manager.
+    """
     data_manager.clean_data()
-    if multiply_by_2:
+    if data_manager.processing_flags['multiply_by_2']:
         data_manager.multiply_forces_by_2()
     data_manager.calculate_lift_coefficient()
     data_manager.calculate_drag_coefficient()
-    if calculate_pressure_center:
+    if data_manager.processing_flags['calculate_pressure_center']:
         data_manager.calculate_moment_coefficient()
         data_manager.calculate_pressure_center()
     data_manager.calculate_cl_cd()
 
-    return data_manager
+
+def load_foil_managers(foil_specs, max_workers=None, use_processes: bool = False):
+    """
+    Create and process many FoilManagers concurrently with foil_manager_procedure.
+
+    Parameters:
+        foil_specs (list): specifications of the foils, each one is either a dict of keyword arguments or a tuple of
+            positional arguments of foil_manager_procedure (data_type, foil_name, path, area, chord_length,
+            multiply_by_2, calculate_pressure_center, ...).
+        max_workers (int): number of workers of the pool, by default chosen by concurrent.futures.
+        use_processes (bool): use a pool of processes instead of threads.
+
+    Returns:
+        dict: foil_name -> FoilManager, in the order of foil_specs.
+    """
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+    with executor_class(max_workers=max_workers) as executor:
+        futures = {}
+        for spec in foil_specs:
+            foil_name = spec['foil_name'] if isinstance(spec, dict) else spec[1]
+            if foil_name in futures:
+                raise ValueError(f"Foil name {foil_name} is specified more than once.")
+
+            if isinstance(spec, dict):
+                futures[foil_name] = executor.submit(foil_manager_procedure, **spec)
+            else:
+                futures[foil_name] = executor.submit(foil_manager_procedure, *spec)
+
+        return {foil_name: future.result() for foil_name, future in futures.items()}
+
+
+class _GroupIndex:
+    """
+    Index of the rows of a DataFrame grouped by the values of a column.
+
+    The rows are sorted by the column once, so the rows of every value are a contiguous block of the sorted copy and
+    are returned as a slice of it, without scanning and copying the whole frame.
+    """
+    def __init__(self, df, column):
+        order = np.argsort(df[column].to_numpy(), kind='stable')
+        self.sorted_data = df.take(order)
+
+        values = self.sorted_data[column].to_numpy()
+        self.keys, starts = np.unique(values, return_index=True)
+        self.offsets = np.append(starts, len(values))
+
+    def rows(self, value, tolerance=FILTER_TOLERANCE):
+        """
+        Rows whose value of the column is the nearest to given value, no rows if it differs more than the tolerance.
+        """
+        idx = np.searchsorted(self.keys, value)
+        # The nearest key is either the first one not lower than the value or the one before it
+        if idx == len(self.keys) or (idx > 0 and value - self.keys[idx - 1] < self.keys[idx] - value):
+            idx -= 1
+        if idx < 0 or abs(self.keys[idx] - value) > tolerance:
+            return self.sorted_data.iloc[0:0]
+        return self.sorted_data.iloc[self.offsets[idx]:self.offsets[idx + 1]]
 
 
 class FoilManager(DataLoadingMixin, DataCleaningMixin, AFT_DataProcessingMixin, CFD_DataProcessingMixin):
-    def __init__(self, results_type: str, foil_name: str, file_path: str, m2_foil_area: float, m_chord_length=0.0):
+    def __init__(self, results_type: str, foil_name: str, file_path: str, m2_foil_area: float, m_chord_length=0.0,
+                 interpolation_backend: str = 'auto'):
         """
         Initializes DataManager which stores single profile's data.
 
@@ -35,37 +141,178 @@ class FoilManager(DataLoadingMixin, DataCleaningMixin, AFT_DataProcessingMixin,
             file_path (str): path to the csv data of foil.
             m2_foil_area (float): area of foil in m2.
             m_chord_length (float): length of chord of foil in m.
+            interpolation_backend (str): 2D interpolation backend, 'auto', 'rbf', 'linear' or 'cubic'
+                (see get_interpolated_value).
         """
         self.foil_name = foil_name
         self.results_type = results_type
         self.m2_foil_area = m2_foil_area
         self.file_path = file_path
         self.m_chord_length = m_chord_length
+        self.interpolation_backend = interpolation_backend
+        # Fitted interpolators keyed by (column_name, method), see CFD_DataProcessingMixin
+        self._interpolators = {}
+        # Compact snapshot of the data, built on first use and dropped whenever the data changes
+        self._dataset = None
+        # Indexes of the rows grouped by inlet_vel / angle_of_attack used by the filters, dropped with the dataset
+        self._group_indexes = {}
+        # Forces of AFT polars calculated on demand: force column -> (coefficient column, density),
+        # see AFT_DataProcessingMixin
+        self._polar_forces = {}
+        # Metadata of the AFT polars (file, reynolds_number, ncrit), set by load_data
+        self.polar_metadata = None
+        # Counter of the changes of the data, results computed from the data can be memoized with it in the key
+        self.data_version = 0
+        # Processing flags of foil_manager_procedure, the rows added by append_data are processed the same way
+        self.processing_flags = {'multiply_by_2': True, 'calculate_pressure_center': True}
+        # Cache file of foil_manager_procedure with the same data, None if the data isn't cached or has diverged from
+        # the cache (e.g. by append_data)
+        self.cache_file = None
         self.data = None
 
         # Set display options to show all columns
         pd.set_option('display.max_columns', None)
 
-    def filter_data_by_velocity(self, velocity):
+    @property
+    def data(self):
+        """
+        DataFrame with the processed results of the foil.
+        """
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        # Any interpolator fitted on the previous frame is no longer valid
+        self._data = value
+        self.invalidate_interpolators()
+
+    @property
+    def dataset(self):
+        """
+        FoilDataset snapshot of the data, used by the interpolators and solvers instead of the DataFrame.
+
+        The snapshot is built on first access and kept until the data changes.
+        """
+        if self._dataset is None:
+            self._dataset = FoilDataset.from_frame(self.data)
+        return self._dataset
+
+    @profiled(record_data=True)
+    def append_data(self, source):
+        """
+        Append new results, e.g. a batch of new simulation cases, to the processed data.
+
+        Only the new rows are cleaned and processed, with the same steps and processing_flags (multiply_by_2,
+        calculate_pressure_center) as the data in foil_manager_procedure. A new row at the (angle_of_attack, inlet_vel)
+        node of an existing row replaces it.
+
+        Only the angle of attack solver is updated incrementally, for the angles of the new rows. The other
+        interpolators (RBF, grid splines, the grid axes) are fitted over all nodes at once, and new angles of attack
+        change the grid itself, so they aren't updated in place: they are dropped and fitted again over all the data on
+        the next query.
+
+        The change of data_version makes the results memoized by OverallAnalysis miss. The on-disk cache of
+        foil_manager_procedure stays keyed by the source csv file, so it isn't rewritten, the manager is marked as
+        diverged from it (cache_file is None).
+
+        Parameters:
+            source (str or pd.DataFrame): path to a csv file of the results type of the manager, or a DataFrame with
+                the same columns as such a file.
+
+        Returns:
+            pd.DataFrame: the processed new rows.
+        """
+        if self.is_polar or self.results_type == 'AFT':
+            raise ValueError("AFT polars are loaded as a whole, add the polar file to the polars directory instead.")
+
+        batch = FoilManager(self.results_type, self.foil_name, self.file_path, self.m2_foil_area, self.m_chord_length,
+                            self.interpolation_backend)
+        batch.processing_flags = dict(self.processing_flags)
+        if isinstance(source, pd.DataFrame):
+            batch.data = source.copy()
+        else:
+            batch.file_path = source
+            batch.load_data()
+        _process_data(batch)
+        new_rows = batch.data
+
+        # Rows at the nodes of the new rows are replaced, the new rows get labels after the existing ones
+        nodes = pd.MultiIndex.from_frame(self.data[['angle_of_attack', 'inlet_vel']])
+        new_nodes = pd.MultiIndex.from_frame(new_rows[['angle_of_attack', 'inlet_vel']])
+        kept = self.data[~nodes.isin(new_nodes)]
+        start = self.data.index.max() + 1 if len(self.data) else 0
+        new_rows = new_rows.set_axis(pd.RangeIndex(start, start + len(new_rows)))
+
+        # The data setter drops all the interpolators, the solver is updated from the one fitted on the old data
+        solver = self._interpolators.get(('lift_coefficient', 'inverse_aoa'))
+        self.data = pd.concat([kept, new_rows])
+        self.cache_file = None
+        if solver is not None:
+            self._interpolators[('lift_coefficient', 'inverse_aoa')] = solver.with_points(
+                new_rows['angle_of_attack'].values, new_rows['inlet_vel'].values, new_rows['lift_coefficient'].values)
+
+        return new_rows
+
+    def _group_index(self, column):
+        """
+        Get the _GroupIndex of the data by given column, building it only on the first call after the data changes.
+        """
+        index = self._group_indexes.get(column)
+        if index is None:
+            index = self._group_indexes[column] = _GroupIndex(self.data, column)
+        return index
+
+    def filter_data_by_velocity(self, velocity, tolerance=FILTER_TOLERANCE):
         """
         Filter the data by a specific inlet velocity.
+
+        The rows are taken from the index of the data grouped by velocity, so the result is a slice of the data sorted
+        by velocity (the rows keep their labels and order) and the data isn't scanned on every call.
+
+        AFT polars are broadcast to any velocity, with the forces calculated at it (see polar_at_velocities).
         
         Parameters:
             velocity (float): The inlet velocity to filter by.
+            tolerance (float): maximal difference between the requested and the stored velocity.
 
         Returns:
             pd.DataFrame: Filtered DataFrame.
         """
-        return self.data[self.data['inlet_vel'] == velocity]
+        if self.is_polar:
+            return self.polar_at_velocities(velocity)
+        return self._group_index('inlet_vel').rows(velocity, tolerance)
 
-    def filter_data_by_angle(self, angle):
+    def filter_data_by_angle(self, angle, velocities=None, tolerance=FILTER_TOLERANCE):
         """
         Filter the data by a specific angle of attack.
+
+        The rows are taken from the index of the data grouped by angle of attack, see filter_data_by_velocity.
         
         Parameters:
             angle (float): The angle of attack to filter by.
+            velocities (array-like): velocities over which AFT polars are broadcast, by default POLAR_VELOCITIES.
+                Ignored for the other data.
+            tolerance (float): maximal difference between the requested and the stored angle of attack.
 
         Returns:
             pd.DataFrame: Filtered DataFrame.
         """
-        return self.data[self.data['angle_of_attack'] == angle]
+        df = self._group_index('angle_of_attack').rows(angle, tolerance)
+        if self.is_polar:
+            return self.polar_at_velocities(POLAR_VELOCITIES if velocities is None else velocities, df)
+        return df
+
+    def tabulated_data(self, velocities=None):
+        """
+        Get the data with inlet_vel column, e.g. for the plots over velocity.
+
+        Parameters:
+            velocities (array-like): velocities over which AFT polars are broadcast, by default POLAR_VELOCITIES.
+                Ignored for the other data.
+
+        Returns:
+            pd.DataFrame: the data, or the polars broadcast over the velocities.
+        """
+        if self.is_polar:
+            return self.polar_at_velocities(POLAR_VELOCITIES if velocities is None else velocities)
+        return self.data
@@ -1,16 +1,63 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from mpl_toolkits.mplot3d import Axes3D
+from matplotlib.figure import Figure
 from scipy.interpolate import make_interp_spline
 
-matplotlib.use('TkAgg')
+# Figure reused by all headless plots of the process, see FoilPlotter._new_figure
+_headless_figure = None
+
+
+def _init_render_worker():
+    # Worker processes render without a display
+    matplotlib.use('Agg')
+
+
+def _render_plot_job(job, output_dir, file_format):
+    data_manager, method_name, args = job
+    plotter = FoilPlotter(data_manager, output_dir, file_format)
+    return getattr(plotter, method_name)(*args)
+
+
+def render_plot_jobs(jobs, output_dir, file_format='png', processes=None):
+    """
+    Render many plots to files, in parallel processes.
+
+    Parameters:
+        jobs (list): plot jobs, each one is a tuple (data_manager, method_name, args), where method_name is the name of
+            a FoilPlotter plot method and args is the tuple of its arguments.
+        output_dir (str): directory where the figures are written.
+        file_format (str): format of the figures, e.g. png, svg, pdf.
+        processes (int): number of worker processes, by default the number of CPUs. With 1 the jobs are rendered in
+            the current process.
+
+    Returns:
+        list: paths of the written figures, in the order of jobs. ValueError is raised if more jobs wrote the same
+        file, e.g. the same plot job is repeated.
+    """
+    if processes == 1:
+        paths = [_render_plot_job(job, output_dir, file_format) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_render_worker) as executor:
+            futures = [executor.submit(_render_plot_job, job, output_dir, file_format) for job in jobs]
+            paths = [future.result() for future in futures]
+
+    # Jobs which write the same file overwrite each other's figure
+    duplicated = sorted({path for path in paths if paths.count(path) > 1})
+    if duplicated:
+        raise ValueError(f"Plot jobs wrote the same files, only the last figure of each is kept: "
+                         f"{', '.join(duplicated)}")
+    return paths
 
 
 def compare_foils_lift(plotterA, plotterB):
     # Create a single figure with a 2x2 grid of subplots
-    fig, axs = plt.subplots(2, 2, figsize=(15, 10))
+    fig, axs = plotterA._new_figure(2, 2, figsize=(15, 10))
     fig.suptitle('Lift Force vs. Angle of Attack Comparison for Different Velocities', fontsize=16)
 
     # Define the velocities to plot
@@ -24,15 +71,16 @@ def compare_foils_lift(plotterA, plotterB):
         plotterA._plot_lift_vs_angle_compare_foils_on_axis(velocity, plotterB.data_manager, ax)
 
     # Adjust layout
-    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
+    fig.tight_layout(rect=[0, 0.03, 1, 0.95])
 
     # Display the plot
-    plt.show()
+    return plotterA._finish_figure(fig, 'compare_lift', plotterA.data_manager.foil_name,
+                                   plotterB.data_manager.foil_name)
 
 
 def compare_foils_drag(plotterA, plotterB):
     # Create a single figure with a 2x2 grid of subplots
-    fig, axs = plt.subplots(2, 2, figsize=(15, 10))
+    fig, axs = plotterA._new_figure(2, 2, figsize=(15, 10))
     fig.suptitle('Drag Force vs. Angle of Attack Comparison for Different Velocities', fontsize=16)
 
     # Define the velocities to plot
@@ -46,22 +94,81 @@ def compare_foils_drag(plotterA, plotterB):
         plotterA._plot_drag_vs_angle_compare_foils_on_axis(velocity, plotterB.data_manager, ax)
 
     # Adjust layout
-    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
+    fig.tight_layout(rect=[0, 0.03, 1, 0.95])
 
     # Display the plot
-    plt.show()
+    return plotterA._finish_figure(fig, 'compare_drag', plotterA.data_manager.foil_name,
+                                   plotterB.data_manager.foil_name)
 
 
 class FoilPlotter:
 
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, output_dir=None, file_format='png'):
+        """
+        Initializes plotter of single profile's data.
+
+        By default the plots are shown interactively. If output_dir is given, the plotter works in the headless mode:
+        figures are drawn with the Agg backend, written to output_dir and the plot methods return the paths of the
+        written files.
+
+        Parameters:
+            data_manager (FoilManager): data of the foil.
+            output_dir (str): directory for the figures of the headless mode.
+            file_format (str): format of the figures of the headless mode, e.g. png, svg, pdf.
+        """
         self.data_manager = data_manager
+        self.output_dir = output_dir
+        self.file_format = file_format
+
+    def _new_figure(self, nrows=1, ncols=1, projection=None, figsize=None):
+        """
+        Create a figure with a grid of axes.
+
+        In the headless mode one figure is reused by all plots of the process, it is cleared instead of creating
+        a new one, which avoids the cost of figure creation and the growth of memory in long batches.
+        """
+        global _headless_figure
+
+        subplot_kw = {'projection': projection} if projection is not None else None
+        if self.output_dir is None:
+            return plt.subplots(nrows, ncols, figsize=figsize, subplot_kw=subplot_kw)
+
+        if _headless_figure is None:
+            _headless_figure = Figure()
+        fig = _headless_figure
+        fig.clear()
+        fig.set_size_inches(figsize if figsize is not None else matplotlib.rcParams['figure.figsize'])
+        return fig, fig.subplots(nrows, ncols, subplot_kw=subplot_kw)
+
+    def _finish_figure(self, fig, *name_parts, block=True):
+        """
+        Show the figure, or in the headless mode write it to the output directory.
+
+        Parameters:
+            fig (Figure): the figure.
+            name_parts: parts of the name of the file, joined with underscores.
+            block (bool): whether showing the figure blocks until it is closed.
+
+        Returns:
+            str: path of the written file in the headless mode, None otherwise.
+        """
+        if self.output_dir is None:
+            plt.show(block=block)
+            return None
+
+        name = '_'.join(str(part) for part in name_parts)
+        name = re.sub(r'[^A-Za-z0-9.,_-]+', '_', name)
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f'{name}.{self.file_format}')
+        fig.savefig(path, format=self.file_format)
+        fig.clear()
+        return path
 
     def plot_lift_vs_angle_compare_velocities(self, velocities, highlight_value=None):
         colors = ['blue', 'green', 'red', 'cyan', 'magenta', 'black']
 
         # Create a figure and an axis
-        fig, ax = plt.subplots()
+        fig, ax = self._new_figure()
 
         # Plot data for each velocity
         for idx, velocity in enumerate(velocities):
@@ -99,13 +206,14 @@ class FoilPlotter:
         ax.legend()
 
         # Display the plot
-        plt.show(block=True)
+        return self._finish_figure(fig, 'lift_vs_angle_velocities', self.data_manager.foil_name, *velocities,
+                                   *([] if highlight_value is None else ['highlight', highlight_value]))
 
     def plot_lift_coefficient_at_target_velocity_compare_foils(self, velocity, other_data_manager):
         colors = ['blue', 'green']  # Colors for two different foils
 
         # Create a figure and an axis
-        fig, ax = plt.subplots()
+        fig, ax = self._new_figure()
 
         # Plot data for the main data manager (self.data_manager)
         df_filtered_main = self.data_manager.filter_data_by_velocity(velocity)
@@ -130,13 +238,14 @@ class FoilPlotter:
         ax.legend()
 
         # Display the plot
-        plt.show(block=True)
+        return self._finish_figure(fig, 'lift_coefficient_foils', self.data_manager.foil_name,
+                                   other_data_manager.foil_name, velocity)
 
     def plot_drag_coefficient_at_target_velocity_compare_foils(self, velocity, other_data_manager):
         colors = ['blue', 'green']  # Colors for two different foils
 
         # Create a figure and an axis
-        fig, ax = plt.subplots()
+        fig, ax = self._new_figure()
 
         # Plot data for the main data manager (self.data_manager)
         df_filtered_main = self.data_manager.filter_data_by_velocity(velocity)
@@ -161,14 +270,15 @@ class FoilPlotter:
         ax.legend()
 
         # Display the plot
-        plt.show(block=True)
+        return self._finish_figure(fig, 'drag_coefficient_foils', self.data_manager.foil_name,
+                                   other_data_manager.foil_name, velocity)
 
     def plot_drag_force_target_velocity_compare_foils(self, velocity, *other_data_managers):
         # Define a list of colors for the plots. Using 'tab20' for more distinctive colors
-        colors = plt.cm.get_cmap('tab20', len(other_data_managers) + 1)  # Including the instance's data manager
+        colors = matplotlib.colormaps['tab20'].resampled(len(other_data_managers) + 1)  # Including the instance's data manager
 
         # Create a figure and an axis
-        fig, ax = plt.subplots()
+        fig, ax = self._new_figure()
 
         # Plot data for the instance's own data manager
         df_filtered_main = self.data_manager.filter_data_by_velocity(velocity)
@@ -192,24 +302,16 @@ class FoilPlotter:
         ax.grid(True)
         ax.legend()
 
-        # Enable interactive mode
-        plt.ion()
-
         # Display the plot
-        plt.show()
-
-        # Keep the plot open for interaction
-        plt.pause(0.001)
-
-        # To keep the plot open indefinitely, use plt.show(block=True) at the end
-        plt.show(block=True)
+        return self._finish_figure(fig, 'drag_force_foils', self.data_manager.foil_name,
+                                   *[dm.foil_name for dm in other_data_managers], velocity)
 
     def plot_cl_cd_at_target_velocity_compare_foils(self, velocity, *other_data_managers):
         # Define a list of colors for the plots. Using 'tab20' for more distinctive colors
-        colors = plt.cm.get_cmap('tab20', len(other_data_managers) + 1)  # Including the instance's data manager
+        colors = matplotlib.colormaps['tab20'].resampled(len(other_data_managers) + 1)  # Including the instance's data manager
 
         # Create a figure and an axis
-        fig, ax = plt.subplots()
+        fig, ax = self._new_figure()
 
         # Plot data for the instance's own data manager
         df_filtered_main = self.data_manager.filter_data_by_velocity(velocity)
@@ -233,23 +335,15 @@ class FoilPlotter:
         ax.grid(True)
         ax.legend()
 
-        # Enable interactive mode
-        plt.ion()
-
         # Display the plot
-        plt.show()
-
-        # Keep the plot open for interaction
-        plt.pause(0.001)
-
-        # To keep the plot open indefinitely, use plt.show(block=True) at the end
-        plt.show(block=True)
+        return self._finish_figure(fig, 'cl_cd_foils', self.data_manager.foil_name,
+                                   *[dm.foil_name for dm in other_data_managers], velocity)
 
     def plot_cl_cd_at_target_velocities(self, velocities):
         colors = ['blue', 'green', 'red', 'cyan', 'magenta', 'black']
 
         # Create a figure and an axis
-        fig, ax = plt.subplots()
+        fig, ax = self._new_figure()
 
         # Plot data for each velocity
         for idx, velocity in enumerate(velocities):
@@ -284,13 +378,13 @@ class FoilPlotter:
         ax.legend()
 
         # Display the plot
-        plt.show(block=True)
+        return self._finish_figure(fig, 'cl_cd_velocities', self.data_manager.foil_name, *velocities)
 
     def plot_lift_vs_velocity_compare_angles(self, angles):
         colors = ['blue', 'green', 'red', 'cyan', 'magenta', 'black']
 
         # Create a figure and an axis
-        fig, ax = plt.subplots()
+        fig, ax = self._new_figure()
 
         # Plot data for each angle
         for idx, angle in enumerate(angles):
@@ -325,16 +419,16 @@ class FoilPlotter:
         ax.legend()
 
         # Display the plot
-        plt.show(block=True)
+        return self._finish_figure(fig, 'lift_vs_velocity_angles', self.data_manager.foil_name, *angles)
 
     def plot_3d_lift_vs_velocity_and_angle_scatter(self):
         """
         Create a 3D plot with velocity on x-axis, angle of attack on y-axis, and lift force on z-axis.
         """
-        fig = plt.figure()
-        ax = fig.add_subplot(111, projection='3d')
+        fig, ax = self._new_figure(projection='3d')
 
-        data_corrected = self.data_manager.data[self.data_manager.data['inlet_vel'] >= 3.0]
+        data = self.data_manager.tabulated_data()
+        data_corrected = data[data['inlet_vel'] >= 3.0]
 
         x = data_corrected['inlet_vel']
         y = data_corrected['angle_of_attack']
@@ -351,13 +445,13 @@ class FoilPlotter:
         ax.set_title(f'3D Plot of Lift Force vs Velocity and Angle of Attack for {self.data_manager.foil_name}')
 
         # Show plot
-        plt.show(block=False)
+        return self._finish_figure(fig, 'lift_3d_scatter', self.data_manager.foil_name, block=False)
 
     def plot_3d_lift_vs_velocity_and_angle_surface(self):
-        fig = plt.figure()
-        ax = fig.add_subplot(111, projection='3d')
+        fig, ax = self._new_figure(projection='3d')
 
-        data_corrected = self.data_manager.data[self.data_manager.data['inlet_vel'] >= 3.0]
+        data = self.data_manager.tabulated_data()
+        data_corrected = data[data['inlet_vel'] >= 3.0]
 
         x = data_corrected['inlet_vel']
         y = data_corrected['angle_of_attack']
@@ -374,7 +468,7 @@ class FoilPlotter:
         ax.set_title(f'3D Surface Plot of Lift Force vs Velocity and Angle of Attack for {self.data_manager.foil_name}')
 
         # Show plot
-        plt.show(block=False)
+        return self._finish_figure(fig, 'lift_3d_surface', self.data_manager.foil_name, block=False)
 
     def plot_lift_vs_angle_compare_foils(self, velocity, other_data_manager):
         """
@@ -387,7 +481,7 @@ class FoilPlotter:
         colors = ['blue', 'green']  # Colors for two different foils
 
         # Create a figure and an axis
-        fig, ax = plt.subplots()
+        fig, ax = self._new_figure()
 
         # Plot data for the main data manager (self.data_manager)
         df_filtered_main = self.data_manager.filter_data_by_velocity(velocity)
@@ -412,7 +506,8 @@ class FoilPlotter:
         ax.legend()
 
         # Display the plot
-        plt.show(block=True)
+        return self._finish_figure(fig, 'lift_vs_angle_foils', self.data_manager.foil_name,
+                                   other_data_manager.foil_name, velocity)
 
     def _plot_lift_vs_angle_compare_foils_on_axis(self, velocity, other_data_manager, ax):
         """
@@ -481,7 +576,7 @@ class FoilPlotter:
     def plot_pressure_center_vs_angle_at_target_velocities(self, velocities):
         colors = ['blue', 'green', 'red', 'cyan', 'magenta', 'black']
 
-        fig, ax = plt.subplots()
+        fig, ax = self._new_figure()
 
         for idx, velocity in enumerate(velocities):
             df_filtered = self.data_manager.filter_data_by_velocity(velocity)
@@ -514,4 +609,4 @@ class FoilPlotter:
         ax.grid(True)
         ax.legend()
 
-        plt.show(block=True)
+        return self._finish_figure(fig, 'pressure_center_velocities', self.data_manager.foil_name, *velocities)
@@ -0,0 +1,109 @@
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from src.foils_data.FoilManager import foil_manager_procedure, load_foil_managers
+
+# Catalog of the datasets shipped with the repository
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent / '..' / '..' / 'foil_catalog' / 'foil_catalog.csv'
+
+_default_registry = None
+
+
+def default_registry():
+    """
+    Get the registry of the default catalog, shared by all analyses.
+    """
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = FoilRegistry(DEFAULT_CATALOG_PATH)
+    return _default_registry
+
+
+class FoilRegistry:
+    def __init__(self, catalog_path, use_cache: bool = True):
+        """
+        Registry of datasets listed in a catalog csv file, which creates FoilManager of a dataset on first access and
+        keeps it for later accesses.
+
+        The catalog has columns: name, results_type, path, area, chord_length, multiply_by_2,
+        calculate_pressure_center. Paths are relative to the directory of the catalog file.
+
+        Parameters:
+            catalog_path (str): path to the catalog csv file.
+            use_cache (bool): whether foil_manager_procedure should use the cache of processed data.
+        """
+        self.catalog_path = Path(catalog_path).resolve()
+        self.use_cache = use_cache
+        self._specs = None
+        self._managers = {}
+        self._lock = threading.Lock()
+
+    def _read_catalog(self):
+        """
+        Read the catalog into specifications of foil_manager_procedure, keyed by the dataset name.
+        """
+        catalog = pd.read_csv(self.catalog_path)
+        catalog_dir = self.catalog_path.parent
+
+        specs = {}
+        for _, row in catalog.iterrows():
+            specs[row['name']] = {
+                'data_type': row['results_type'],
+                'foil_name': row['name'],
+                'path': (catalog_dir / row['path']).resolve(),
+                'area': float(row['area']),
+                'chord_length': float(row['chord_length']),
+                'multiply_by_2': bool(row['multiply_by_2']),
+                'calculate_pressure_center': bool(row['calculate_pressure_center']),
+                'use_cache': self.use_cache,
+            }
+        return specs
+
+    @property
+    def specs(self):
+        """
+        Specifications of all datasets of the catalog, the catalog is read on first access.
+        """
+        if self._specs is None:
+            self._specs = self._read_catalog()
+        return self._specs
+
+    def names(self):
+        """
+        Names of all datasets of the catalog.
+        """
+        return list(self.specs)
+
+    def __contains__(self, name):
+        return name in self.specs
+
+    def __getitem__(self, name):
+        """
+        Get the FoilManager of the dataset, it is loaded and processed only on the first access.
+        """
+        if name not in self.specs:
+            raise KeyError(f"Dataset {name} is not listed in the catalog {self.catalog_path}")
+
+        with self._lock:
+            if name not in self._managers:
+                self._managers[name] = foil_manager_procedure(**self.specs[name])
+            return self._managers[name]
+
+    def load(self, names, max_workers=None, use_processes: bool = False):
+        """
+        Load several datasets concurrently, the ones already loaded are reused.
+
+        Returns:
+            dict: name -> FoilManager, in the order of names.
+        """
+        for name in names:
+            if name not in self.specs:
+                raise KeyError(f"Dataset {name} is not listed in the catalog {self.catalog_path}")
+
+        with self._lock:
+            missing = [self.specs[name] for name in dict.fromkeys(names) if name not in self._managers]
+            self._managers.update(load_foil_managers(missing, max_workers, use_processes))
+
+        return {name: self._managers[name] for name in names}
@@ -1,31 +1,9 @@
 WATER_DENSITY = 997  # kg/m^3
 GRAVITATIONAL_ACCELERATION = 9.81  # m/s^2
+WATER_KINEMATIC_VISCOSITY = 1.0e-6  # m^2/s, at about 20 deg C
 
 
-# foils parameters:
+# foils parameters, the areas and chord lengths of the datasets are kept in foil_catalog/foil_catalog.csv
 NACA6409_TOTAL_LENGTH = 0.732  # in m
-NACA6409_CHORD_LENGTH = 0.1  # in m
-NACA6409_AREA = 0.064219  # in m^2
 
 NACA64A715_TOTAL_LENGTH = 0.830  # in m
-NACA64A715_CHORD_LENGTH = 0.105  # in m
-NACA64A715_AREA = 0.068615  # in m^2
-
-EPPLER908_AREA = 0.06129154  # in m^2
-NACA_0_033_AREA = 0.03178   # in m^2
-NACA_0_033_CHORD_LENGTH = 0.0848 # in m
-
-# winglet parameters
-WINGLET_2_AREA = 0.07297138
-WINGLET_3_AREA = 0.0675821
-WINGLET_4_AREA = 0.06803624
-WINGLET_5_AREA = 0.0698586
-
-NACA6409_PROST_AREA = 0.0652613
-NACA6409_WING_AREA = 0.06849242
-
-
-
-
-
-
@@ -0,0 +1,195 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Opt-in profiling of the hot paths of the data pipeline. The profiled functions are wrapped with the profiled
+# decorator, which only checks a flag while profiling is disabled.
+#
+# Profiling is enabled with enable() or with the environment variable FOILS_PROFILE:
+#   FOILS_PROFILE=table          text table printed to stderr at process exit (also FOILS_PROFILE=1)
+#   FOILS_PROFILE=json           json printed to stderr at process exit
+#   FOILS_PROFILE=report.json    json written to the file at process exit
+ENV_VARIABLE = 'FOILS_PROFILE'
+
+REPORT_FORMATS = ['table', 'json']
+
+_enabled = False
+_exit_report = None
+_atexit_registered = False
+
+# name -> [calls, total time, own time (without nested profiled calls), max rows, max bytes]
+_records = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def enable(report_format=None, output=None):
+    """
+    Start recording the profiled calls.
+
+    Parameters:
+        report_format (str): if given, the report is written at process exit in this format, 'table' or 'json'.
+        output (str): path of the file of the report written at exit, by default it is printed to stderr.
+    """
+    global _enabled, _exit_report, _atexit_registered
+
+    if report_format is not None:
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format {report_format}, available are: {', '.join(REPORT_FORMATS)}")
+        _exit_report = (report_format, output)
+        if not _atexit_registered:
+            atexit.register(_write_exit_report)
+            _atexit_registered = True
+
+    _enabled = True
+
+
+def disable():
+    """
+    Stop recording the profiled calls, the records are kept.
+    """
+    global _enabled, _exit_report
+    _enabled = False
+    _exit_report = None
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """
+    Forget all records.
+    """
+    with _lock:
+        _records.clear()
+
+
+def _record(name, elapsed, own, data):
+    rows = nbytes = 0
+    if data is not None and hasattr(data, 'memory_usage'):
+        rows = len(data)
+        nbytes = int(data.memory_usage(index=True).sum())
+
+    with _lock:
+        record = _records.setdefault(name, [0, 0.0, 0.0, 0, 0])
+        record[0] += 1
+        record[1] += elapsed
+        record[2] += own
+        record[3] = max(record[3], rows)
+        record[4] = max(record[4], nbytes)
+
+
+def profiled(name=None, record_data=False):
+    """
+    Decorator of a profiled function.
+
+    Parameters:
+        name (str or callable): name of the record, by default the qualified name of the function. A callable gets
+            the arguments of the call and returns the name, e.g. to record the calls separately by an argument.
+        record_data (bool): record the size of self.data (rows, bytes) after the call, for methods of FoilManager.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+
+            record_name = name(*args, **kwargs) if callable(name) else (name or function.__qualname__)
+
+            # Time of the nested profiled calls is subtracted from the own time of the caller
+            stack = getattr(_local, 'stack', None)
+            if stack is None:
+                stack = _local.stack = []
+            stack.append(0.0)
+
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                data = getattr(args[0], 'data', None) if record_data and args else None
+                _record(record_name, elapsed, elapsed - nested, data)
+
+        return wrapper
+
+    return decorator
+
+
+def report():
+    """
+    Get the records of the profiled calls.
+
+    Returns:
+        dict: name -> dict with calls, total_time_s, own_time_s (without nested profiled calls, e.g. interpolator
+        build inside get_interpolated_value), mean_time_s, max_rows and max_bytes (size of the data after the call).
+    """
+    with _lock:
+        records = {name: list(record) for name, record in _records.items()}
+
+    return {
+        name: {
+            'calls': calls,
+            'total_time_s': total,
+            'own_time_s': own,
+            'mean_time_s': total / calls,
+            'max_rows': rows,
+            'max_bytes': nbytes,
+        }
+        for name, (calls, total, own, rows, nbytes) in sorted(records.items(), key=lambda item: -item[1][1])
+    }
+
+
+def report_json():
+    """
+    Get the report as json.
+    """
+    return json.dumps(report(), indent=2)
+
+
+def report_table():
+    """
+    Get the report as a text table, sorted by the total time.
+    """
+    lines = [f'{"function":60s} {"calls":>8s} {"total [s]":>10s} {"own [s]":>10s} {"mean [ms]":>10s} '
+             f'{"rows":>9s} {"MB":>8s}']
+    for name, record in report().items():
+        lines.append(f'{name:60s} {record["calls"]:8d} {record["total_time_s"]:10.4f} {record["own_time_s"]:10.4f} '
+                     f'{record["mean_time_s"] * 1000:10.3f} {record["max_rows"]:9d} '
+                     f'{record["max_bytes"] / 2 ** 20:8.2f}')
+    return '\n'.join(lines)
+
+
+def _write_exit_report():
+    if _exit_report is None:
+        return
+
+    report_format, output = _exit_report
+    text = report_table() if report_format == 'table' else report_json()
+    if output is None:
+        sys.stderr.write(text + '\n')
+    else:
+        with open(output, 'w') as file:
+            file.write(text + '\n')
+
+
+def _enable_from_environment():
+    value = os.environ.get(ENV_VARIABLE, '')
+    if not value or value == '0':
+        return
+    if value in ('1', 'table'):
+        enable('table')
+    elif value == 'json':
+        enable('json')
+    else:
+        enable('json', value)
+
+
+_enable_from_environment()
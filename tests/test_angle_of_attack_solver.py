@@ -0,0 +1,91 @@
+"""
+The vectorized solver of the angle of attack gives the same results as the former loop over the angles.
+"""
+import numpy as np
+import pytest
+
+from src.foils_data.AngleOfAttackSolver import AngleOfAttackSolver
+from src.foils_data.FoilManager import foil_manager_procedure
+from src.foils_data.FoilRegistry import default_registry
+
+
+def _find_angle_of_attack_loop(inlet_vel, desired_lift_coefficient, df):
+    """
+    Former solver: the lift coefficient of every angle is interpolated at the velocity, then the angle is
+    interpolated as a function of the lift coefficient.
+    """
+    lift_coeff_list = []
+    for angle in np.unique(df['angle_of_attack'].values):
+        df_angle = df[df['angle_of_attack'] == angle]
+        inlet_vels = df_angle['inlet_vel'].values
+        lift_coeffs = df_angle['lift_coefficient'].values
+        if inlet_vel < inlet_vels.min() or inlet_vel > inlet_vels.max():
+            continue
+        lift_coeff_list.append((angle, np.interp(inlet_vel, inlet_vels, lift_coeffs)))
+
+    if not lift_coeff_list:
+        raise ValueError(f"No data available to interpolate for inlet_vel={inlet_vel}")
+
+    angles = np.array([item[0] for item in lift_coeff_list])
+    lift_coeffs = np.array([item[1] for item in lift_coeff_list])
+    if desired_lift_coefficient < lift_coeffs.min() or desired_lift_coefficient > lift_coeffs.max():
+        raise ValueError(
+            f"Desired lift coefficient {desired_lift_coefficient} is outside the achievable range "
+            f"[{lift_coeffs.min()}, {lift_coeffs.max()}] at inlet_vel={inlet_vel}"
+        )
+
+    sorted_indices = np.argsort(lift_coeffs)
+    return np.interp(desired_lift_coefficient, lift_coeffs[sorted_indices], angles[sorted_indices])
+
+
+@pytest.fixture(scope='module')
+def data():
+    spec = default_registry().specs['NACA 6409']
+    return foil_manager_procedure(**dict(spec, use_cache=False)).data
+
+
+def _queries(data):
+    """
+    Pairs of velocities and lift coefficients spread over the whole achievable range, including its ends.
+    """
+    velocities = np.linspace(data['inlet_vel'].min(), data['inlet_vel'].max(), 7)
+    solver = AngleOfAttackSolver.from_data(data)
+    curves = solver.lift_coefficients_at(velocities)
+    cl_min, cl_max = np.nanmin(curves, axis=0), np.nanmax(curves, axis=0)
+    fractions = np.linspace(0.0, 1.0, 9)[:, None]
+    lift_coefficients = cl_min + fractions * (cl_max - cl_min)
+    return np.broadcast_arrays(velocities, lift_coefficients)
+
+
+def test_scalar_solve_matches_loop(data):
+    solver = AngleOfAttackSolver.from_data(data)
+    for velocity, lift_coefficient in zip(*(q.ravel() for q in _queries(data))):
+        expected = _find_angle_of_attack_loop(velocity, lift_coefficient, data)
+        assert solver.solve(velocity, lift_coefficient) == pytest.approx(expected, abs=1e-9)
+
+
+def test_batch_solve_matches_loop(data):
+    velocities, lift_coefficients = _queries(data)
+    expected = np.vectorize(lambda v, cl: _find_angle_of_attack_loop(v, cl, data))(velocities, lift_coefficients)
+
+    angles = AngleOfAttackSolver.from_data(data).solve(velocities, lift_coefficients)
+
+    assert angles.shape == velocities.shape
+    np.testing.assert_allclose(angles, expected, atol=1e-9)
+
+
+@pytest.mark.parametrize('offset, message', [(1.0, 'outside the achievable range'),
+                                             (None, 'No data available')])
+def test_unsolvable_queries_raise_like_loop(data, offset, message):
+    velocity = data['inlet_vel'].min() + 0.5 if offset is not None else data['inlet_vel'].max() + 1.0
+    lift_coefficient = data['lift_coefficient'].max() + (offset or 0.0)
+    solver = AngleOfAttackSolver.from_data(data)
+
+    with pytest.raises(ValueError, match=message):
+        _find_angle_of_attack_loop(velocity, lift_coefficient, data)
+    with pytest.raises(ValueError, match=message):
+        solver.solve(velocity, lift_coefficient)
+    # Without strict the unsolvable queries are NaN among the solved ones
+    angles = solver.solve([velocity, data['inlet_vel'].min()], [lift_coefficient, data['lift_coefficient'].median()],
+                          strict=False)
+    assert np.isnan(angles[0]) and not np.isnan(angles[1])
@@ -0,0 +1,71 @@
+"""
+Appending new results to a FoilManager gives the same data and interpolation as processing all results at once.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.foils_data.FoilManager import foil_manager_procedure
+from src.foils_data.FoilRegistry import default_registry
+
+# Rows of these angles of attack are appended as a new batch
+APPENDED_ANGLES = [1.0, 2.0]
+
+
+def _split_csv(source, tmp_path):
+    """
+    Split a csv file of results into the rows of APPENDED_ANGLES and the other rows, with the same header lines.
+    """
+    lines = source.read_text().splitlines(keepends=True)
+    header, rows = lines[:2], lines[2:]
+    appended = [row for row in rows if row.split(';')[1] and float(row.split(';')[1]) in APPENDED_ANGLES]
+    assert appended, f'{source} has no rows of the appended angles'
+
+    base_path, batch_path = tmp_path / 'base.csv', tmp_path / 'batch.csv'
+    base_path.write_text(''.join(header + [row for row in rows if row not in appended]))
+    batch_path.write_text(''.join(header + appended))
+    return base_path, batch_path
+
+
+def _sorted(df):
+    return df.sort_values(['angle_of_attack', 'inlet_vel']).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('dataset', ['NACA 6409', 'New front drags'])
+def test_append_data_matches_full_load(dataset, tmp_path):
+    spec = dict(default_registry().specs[dataset], use_cache=False)
+    base_path, batch_path = _split_csv(spec['path'], tmp_path)
+
+    full = foil_manager_procedure(**spec)
+    manager = foil_manager_procedure(**dict(spec, path=base_path))
+    # The solver fitted on the old data is updated with the new rows
+    manager.get_angle_of_attack_solver()
+    version = manager.data_version
+
+    manager.append_data(str(batch_path))
+
+    assert manager.data_version > version
+    pd.testing.assert_frame_equal(_sorted(manager.data[full.data.columns]), _sorted(full.data))
+
+    velocities = np.array([5.0, 6.5, 8.0])
+    np.testing.assert_allclose(manager.get_angle_of_attack_solver().solve(velocities, 0.6),
+                               full.get_angle_of_attack_solver().solve(velocities, 0.6))
+    np.testing.assert_allclose(manager.get_interpolated_lift_coefficient(np.full(3, 1.5), velocities),
+                               full.get_interpolated_lift_coefficient(np.full(3, 1.5), velocities))
+
+
+def test_append_data_replaces_existing_nodes():
+    spec = dict(default_registry().specs['New front drags'], use_cache=False)
+    manager = foil_manager_procedure(**spec)
+    rows = len(manager.data)
+
+    # Raw rows are doubled by multiply_by_2 of the manager
+    node = manager.data.iloc[[0]][['inlet_vel', 'angle_of_attack', 'lift_force', 'drag_force', 'drag_force_pylon',
+                                  'drag_force_mocowanie']]
+    raw = node / 2
+    raw[['inlet_vel', 'angle_of_attack']] = node[['inlet_vel', 'angle_of_attack']]
+    raw['lift_force'] *= 1.1
+    new_rows = manager.append_data(raw)
+
+    assert len(manager.data) == rows
+    assert new_rows['lift_force'].iloc[0] == pytest.approx(node['lift_force'].iloc[0] * 1.1)
@@ -0,0 +1,62 @@
+"""
+The numpy distances and distributions of masses give the same results as the former shapely geometry.
+"""
+import numpy as np
+import pytest
+
+from src.boat_analysis.Boat import Boat, _distance_to_segment
+
+shapely = pytest.importorskip('shapely')
+
+
+def _shapely_distribution(mass, mass_center_x_position, front_pylons_x_position, front_pylons_y_width,
+                          rear_pylon_x_position):
+    """
+    Former distribution of masses computed with shapely points and lines.
+    """
+    rear_pylon_pos = shapely.Point(0.0, rear_pylon_x_position)
+    front_pylon_right_pos = shapely.Point(front_pylons_y_width, front_pylons_x_position)
+    front_pylon_left_pos = shapely.Point(-front_pylons_y_width, front_pylons_x_position)
+    mass_center_pos = shapely.Point(0.0, mass_center_x_position)
+
+    line_2_3 = shapely.LineString([front_pylon_right_pos, front_pylon_left_pos])
+    line_3_1 = shapely.LineString([front_pylon_left_pos, rear_pylon_pos])
+    line_1_2 = shapely.LineString([rear_pylon_pos, front_pylon_right_pos])
+    return {
+        "rear_pylon_mass": mass * mass_center_pos.distance(line_2_3) / rear_pylon_pos.distance(line_2_3),
+        "front_pylon_right_mass": mass * mass_center_pos.distance(line_3_1) / front_pylon_right_pos.distance(line_3_1),
+        "front_pylon_left_mass": mass * mass_center_pos.distance(line_1_2) / front_pylon_left_pos.distance(line_1_2),
+    }
+
+
+def test_distance_to_segment_matches_shapely():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-5, 5, size=(200, 2))
+    segments = rng.uniform(-5, 5, size=(200, 4))
+    # Segments of zero length are distances to a point
+    segments[:10, 2:] = segments[:10, :2]
+
+    distances = _distance_to_segment(points[:, 0], points[:, 1], *segments.T)
+
+    expected = [shapely.Point(point).distance(shapely.LineString([segment[:2], segment[2:]]))
+                for point, segment in zip(points, segments)]
+    np.testing.assert_allclose(distances, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_mass_distribution_matches_shapely():
+    boat = Boat(6, 1.6, 170, 4.3, 0.72, 0.7)
+    # Centers of mass inside the triangle of pylons and beyond its front and rear
+    mass_center_x_positions = np.linspace(-1.0, 6.0, 29)
+
+    sweep = boat.mass_distribution_sweep(mass_center_x_positions)
+
+    for index, mass_center_x_position in enumerate(mass_center_x_positions):
+        expected = _shapely_distribution(170, mass_center_x_position, 4.3, 0.72, 0.7)
+        for name, value in expected.items():
+            assert sweep[name][index] == pytest.approx(value, rel=1e-12)
+
+    distribution = boat.distribution_of_masses(3.0, 4.3, 0.72, 0.7)
+    expected = _shapely_distribution(170, 3.0, 4.3, 0.72, 0.7)
+    assert distribution.rear_pylon_mass == pytest.approx(expected['rear_pylon_mass'], rel=1e-12)
+    assert distribution.front_pylon_right_mass == pytest.approx(expected['front_pylon_right_mass'], rel=1e-12)
+    assert distribution.front_pylon_left_mass == pytest.approx(expected['front_pylon_left_mass'], rel=1e-12)
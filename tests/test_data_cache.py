@@ -0,0 +1,71 @@
+"""
+Processed datasets are restored unchanged from the cache and the cache is invalidated by changes of the csv file or of
+the processing parameters.
+"""
+import shutil
+
+import pandas as pd
+
+from src.foils_data.DataCache import cache_key, cache_path, load_cached_data, save_cached_data
+from src.foils_data.FoilManager import foil_manager_procedure
+from src.foils_data.FoilRegistry import default_registry
+
+
+def _spec(tmp_path):
+    """
+    Specification of a CFD dataset whose csv file is copied to tmp_path, so the test can modify it.
+    """
+    spec = dict(default_registry().specs['NACA 6409'])
+    spec['path'] = shutil.copy(spec['path'], tmp_path / 'results.csv')
+    return spec
+
+
+def test_round_trip(tmp_path):
+    data = foil_manager_procedure(**dict(_spec(tmp_path), use_cache=False)).data
+    path = cache_path('round_trip', tmp_path / 'cache')
+
+    assert load_cached_data(path) is None
+    save_cached_data(path, data)
+    pd.testing.assert_frame_equal(load_cached_data(path), data)
+
+
+def test_non_numeric_data_is_not_cached(tmp_path):
+    path = cache_path('non_numeric', tmp_path)
+    save_cached_data(path, pd.DataFrame({'name': ['a', 'b']}))
+    assert load_cached_data(path) is None
+
+
+def test_key_changes_with_content_and_parameters(tmp_path):
+    path = _spec(tmp_path)['path']
+    key = cache_key(path, 'CFD', 0.1, 0.1, True, True)
+
+    assert cache_key(path, 'CFD', 0.1, 0.1, True, True) == key
+    assert cache_key(path, 'CFD', 0.2, 0.1, True, True) != key
+    assert cache_key(path, 'CFD', 0.1, 0.1, False, True) != key
+
+    with open(path, 'a') as file:
+        file.write('\n')
+    assert cache_key(path, 'CFD', 0.1, 0.1, True, True) != key
+
+
+def test_procedure_hits_and_invalidates_cache(tmp_path):
+    spec = _spec(tmp_path)
+    cache_dir = tmp_path / 'cache'
+
+    written = foil_manager_procedure(**spec, cache_dir=cache_dir)
+    assert written.cache_file is not None and written.cache_file.exists()
+
+    loaded = foil_manager_procedure(**spec, cache_dir=cache_dir)
+    assert loaded.cache_file == written.cache_file
+    pd.testing.assert_frame_equal(loaded.data, written.data)
+
+    # Other processing parameters are cached in another file
+    rescaled = foil_manager_procedure(**dict(spec, area=2 * spec['area']), cache_dir=cache_dir)
+    assert rescaled.cache_file != written.cache_file
+
+    # A modified csv file is processed again
+    with open(spec['path'], 'a') as file:
+        file.write('\n')
+    modified = foil_manager_procedure(**spec, cache_dir=cache_dir)
+    assert modified.cache_file != written.cache_file
+    pd.testing.assert_frame_equal(modified.data, written.data)
@@ -0,0 +1,41 @@
+"""
+Single-pass parsing of the csv files of CFD results gives the same frames as the former parsing of strings.
+"""
+import pandas as pd
+import pytest
+
+from src.foils_data.DataLoading import RESULTS_COLUMNS
+from src.foils_data.FoilManager import FoilManager
+from src.foils_data.FoilRegistry import default_registry
+
+# Datasets of every results type parsed from csv files
+DATASETS = [name for name, spec in default_registry().specs.items() if spec['data_type'] in RESULTS_COLUMNS]
+
+
+def _parse_as_strings(path, results_type):
+    """
+    Former parsing: all columns are read as strings, the header is promoted from the first row and every column is
+    converted to float64. Rows with missing values of the drag results are removed.
+    """
+    data = pd.read_csv(path, delimiter=';')
+    data.columns = data.iloc[0]
+    data = data[1:].reset_index(drop=True)
+    data.columns.name = None
+    for column in RESULTS_COLUMNS[results_type]:
+        data[column] = pd.to_numeric(data[column], errors='coerce').astype('float64')
+    if results_type in ('FRONT_DRAG', 'REAR_DRAG'):
+        data = data.dropna()
+    return data
+
+
+@pytest.mark.parametrize('dataset', DATASETS)
+def test_single_pass_parsing_matches_string_parsing(dataset):
+    spec = default_registry().specs[dataset]
+    manager = FoilManager(spec['data_type'], dataset, spec['path'], spec['area'], spec['chord_length'])
+    manager.load_data()
+    manager.clean_data()
+
+    columns = RESULTS_COLUMNS[spec['data_type']]
+    expected = _parse_as_strings(spec['path'], spec['data_type'])
+    pd.testing.assert_frame_equal(manager.data[columns], expected[columns])
+    assert all(dtype == 'float64' for dtype in manager.data[columns].dtypes)
@@ -0,0 +1,39 @@
+"""
+Filtering of the data by velocity and angle of attack returns the rows of the nearest stored value within the tolerance.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.foils_data.FoilManager import FILTER_TOLERANCE, foil_manager_procedure
+from src.foils_data.FoilRegistry import default_registry
+
+
+@pytest.fixture(scope='module')
+def manager():
+    return foil_manager_procedure(**dict(default_registry().specs['NACA 6409'], use_cache=False))
+
+
+@pytest.mark.parametrize('column, method', [('inlet_vel', 'filter_data_by_velocity'),
+                                            ('angle_of_attack', 'filter_data_by_angle')])
+def test_filter_matches_mask_within_tolerance(manager, column, method):
+    data = manager.data
+    values = np.unique(data[column])
+    filter_data = getattr(manager, method)
+
+    for value in values:
+        expected = data[data[column] == value]
+        assert len(expected) > 0
+        pd.testing.assert_frame_equal(filter_data(value), expected)
+        # Values which differ by a rounding error of the float still find the rows
+        pd.testing.assert_frame_equal(filter_data(value + FILTER_TOLERANCE / 10), expected)
+        pd.testing.assert_frame_equal(filter_data(value - FILTER_TOLERANCE / 10), expected)
+        # Values which differ more than the tolerance find no rows
+        assert filter_data(value + 10 * FILTER_TOLERANCE).empty
+        assert filter_data(value, tolerance=0.0).equals(expected)
+
+    # Values between the stored ones and outside of them find no rows
+    assert filter_data((values[0] + values[1]) / 2).empty
+    assert filter_data(values[0] - 1.0).empty
+    assert filter_data(values[-1] + 1.0).empty
+    assert list(filter_data(values[0] - 1.0).columns) == list(data.columns)
@@ -0,0 +1,40 @@
+"""
+Pickling of FoilDataset and of the FoilManagers which have built it.
+"""
+import copy
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from src.foils_data.FoilDataset import FoilDataset
+from src.foils_data.FoilManager import FoilManager
+
+
+def _frame():
+    velocity, angle = np.meshgrid([5.0, 6.0, 7.0], [-2.0, 0.0, 2.0, 4.0], indexing='ij')
+    return pd.DataFrame({
+        'inlet_vel': velocity.ravel(),
+        'angle_of_attack': angle.ravel(),
+        'lift_coefficient': 0.4 + 0.1 * angle.ravel() + 0.01 * velocity.ravel(),
+    })
+
+
+def test_dataset_pickle_round_trip():
+    dataset = FoilDataset.from_frame(_frame())
+
+    for restored in (pickle.loads(pickle.dumps(dataset)), copy.deepcopy(dataset)):
+        assert restored.columns == dataset.columns
+        np.testing.assert_array_equal(restored.values, dataset.values)
+        np.testing.assert_array_equal(restored.angle_axis, dataset.angle_axis)
+        assert not restored.values.flags.writeable
+
+
+def test_used_manager_pickle_round_trip():
+    manager = FoilManager('CFD', 'test', 'test.csv', 0.05, 0.1)
+    manager.data = _frame()
+    expected = manager.get_angle_of_attack_solver().solve(6.0, 0.5)
+
+    restored = pickle.loads(pickle.dumps(manager))
+    assert restored.get_angle_of_attack_solver().solve(6.0, 0.5) == expected
+    pd.testing.assert_frame_equal(restored.dataset.frame, manager.dataset.frame)
@@ -0,0 +1,15 @@
+"""
+Import-time budget of the library modules, see benchmarks/import_time.py.
+"""
+import pytest
+
+from benchmarks.import_time import DEFAULT_BUDGET, LIBRARY_MODULES, measure_import
+
+
+@pytest.mark.parametrize('module', LIBRARY_MODULES)
+def test_import_time(module):
+    elapsed, loaded, output = measure_import(module)
+
+    assert elapsed <= DEFAULT_BUDGET, f'import of {module} took {elapsed:.3f} s'
+    assert not loaded, f'import of {module} imported {", ".join(loaded)}'
+    assert output == '', f'import of {module} printed to stdout: {output!r}'
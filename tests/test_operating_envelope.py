@@ -0,0 +1,65 @@
+"""
+The operating envelope solved in one batch gives the same flight states as solving every point on its own.
+"""
+import numpy as np
+import pytest
+
+from src.boat_analysis.Boat import Boat
+from src.boat_analysis.OperatingEnvelope import flight_state, operating_envelope
+from src.boat_analysis.OverallAnalysis import _calculate_aoa_based_on_area, design_foil_areas
+from src.foils_data.FoilManager import foil_manager_procedure
+from src.foils_data.FoilRegistry import default_registry
+
+VELOCITIES = np.linspace(5, 10, 6)
+MASS_RATIOS = np.linspace(0.5, 0.8, 5)
+
+
+@pytest.fixture(scope='module')
+def envelope():
+    boat = Boat(6, 1.6, 170, 4.3, 0.72, 0.7)
+    manager = foil_manager_procedure(**dict(default_registry().specs['New front drags'], use_cache=False))
+    rear_foil_area, front_foil_area = design_foil_areas(boat, manager)
+    result = operating_envelope(VELOCITIES, MASS_RATIOS, boat, front_foil_area, rear_foil_area, manager, manager)
+    return boat, manager, front_foil_area, rear_foil_area, result
+
+
+def _point_aoa(foil_area, velocity, pylon_mass, manager):
+    """
+    Angle of attack of a single point solved strictly, NaN when the required lift coefficient is out of data.
+    """
+    try:
+        return _calculate_aoa_based_on_area(foil_area, velocity, pylon_mass, manager)
+    except ValueError:
+        return np.nan
+
+
+def test_trim_angles_match_pointwise_solve(envelope):
+    boat, manager, front_foil_area, rear_foil_area, result = envelope
+    masses = boat.mass_ratio_sweep(result['front_mass_ratio'])
+
+    for index in np.ndindex(result['velocity'].shape):
+        velocity = result['velocity'][index]
+        front_aoa = _point_aoa(front_foil_area, velocity, masses['front_pylon_mass'][index], manager)
+        rear_aoa = _point_aoa(rear_foil_area, velocity, masses['rear_pylon_mass'][index], manager)
+        feasible = not (np.isnan(front_aoa) or np.isnan(rear_aoa))
+
+        assert result['feasible'][index] == feasible
+        if feasible:
+            assert result['front_aoa'][index] == pytest.approx(front_aoa, abs=1e-9)
+            assert result['rear_aoa'][index] == pytest.approx(rear_aoa, abs=1e-9)
+        else:
+            assert np.isnan(result['power'][index])
+
+    # The grid covers both feasible and infeasible flights
+    assert result['feasible'].any() and not result['feasible'].all()
+
+
+def test_batch_matches_single_flight_states(envelope):
+    boat, manager, front_foil_area, rear_foil_area, result = envelope
+    masses = boat.mass_ratio_sweep(result['front_mass_ratio'])
+
+    for index in zip(*np.nonzero(result['feasible'])):
+        state = flight_state(result['velocity'][index], masses['front_pylon_mass'][index],
+                             masses['rear_pylon_mass'][index], front_foil_area, rear_foil_area, manager, manager)
+        for name in ('total_drag', 'power'):
+            assert state[name] == pytest.approx(result[name][index], rel=1e-12)